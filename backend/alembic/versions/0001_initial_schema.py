@@ -0,0 +1,72 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases created by Base.metadata.create_all() before migrations
+    # existed already have these tables; adopt them as they are
+    existing = sa.inspect(op.get_bind()).get_table_names()
+
+    if "conversions" not in existing:
+        op.create_table(
+            "conversions",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("filename", sa.String(), nullable=False),
+            sa.Column("file_format", sa.String(), nullable=False),
+            sa.Column(
+                "status",
+                sa.Enum("PENDING", "PROCESSING", "COMPLETED", "FAILED", "CANCELLED", name="conversionstatus"),
+                nullable=True,
+            ),
+            sa.Column("voice_id", sa.String(), nullable=True),
+            sa.Column("output_path", sa.String(), nullable=True),
+            sa.Column("progress", sa.Float(), nullable=True),
+            sa.Column("error_message", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+            sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("task_id", sa.String(), nullable=True),
+            sa.Column("chunks_total", sa.Integer(), nullable=True),
+            sa.Column("chunks_completed", sa.Integer(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_conversions_id", "conversions", ["id"])
+
+    if "voice_profiles" not in existing:
+        op.create_table(
+            "voice_profiles",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("voice_type", sa.String(), nullable=False),
+            sa.Column("file_path", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("name"),
+        )
+        op.create_index("ix_voice_profiles_id", "voice_profiles", ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_voice_profiles_id", table_name="voice_profiles")
+    op.drop_table("voice_profiles")
+    op.drop_index("ix_conversions_id", table_name="conversions")
+    op.drop_table("conversions")
+    sa.Enum(name="conversionstatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,32 @@
+"""add conversion content hash
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("conversions")}
+    if "content_hash" not in columns:
+        op.add_column("conversions", sa.Column("content_hash", sa.String(length=64), nullable=True))
+        op.create_index("ix_conversions_content_hash", "conversions", ["content_hash"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_conversions_content_hash", table_name="conversions")
+    op.drop_column("conversions", "content_hash")
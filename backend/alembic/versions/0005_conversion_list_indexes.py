@@ -0,0 +1,33 @@
+"""add conversion list indexes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    indexes = {i["name"] for i in sa.inspect(op.get_bind()).get_indexes("conversions")}
+    if "ix_conversions_status_created_at" not in indexes:
+        op.create_index("ix_conversions_status_created_at", "conversions", ["status", "created_at", "id"])
+    if "ix_conversions_created_at" not in indexes:
+        op.create_index("ix_conversions_created_at", "conversions", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_conversions_created_at", table_name="conversions")
+    op.drop_index("ix_conversions_status_created_at", table_name="conversions")
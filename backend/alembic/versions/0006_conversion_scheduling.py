@@ -0,0 +1,42 @@
+"""add conversion scheduling columns
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    columns = {c["name"] for c in inspector.get_columns("conversions")}
+    if "submitter" not in columns:
+        op.add_column("conversions", sa.Column("submitter", sa.String(), nullable=True))
+    if "lane" not in columns:
+        op.add_column("conversions", sa.Column("lane", sa.String(), nullable=True))
+    if "estimated_chars" not in columns:
+        op.add_column("conversions", sa.Column("estimated_chars", sa.Integer(), nullable=True))
+
+    indexes = {i["name"] for i in inspector.get_indexes("conversions")}
+    if "ix_conversions_submitter_status" not in indexes:
+        op.create_index("ix_conversions_submitter_status", "conversions", ["submitter", "status", "lane"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_conversions_submitter_status", table_name="conversions")
+    op.drop_column("conversions", "estimated_chars")
+    op.drop_column("conversions", "lane")
+    op.drop_column("conversions", "submitter")
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Set
+import redis
+import redis.asyncio as aioredis
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class EventSubscriber:
+    """Events waiting for one client, coalesced per conversion.
+
+    A slow client skips intermediate updates but always gets the latest
+    state of every conversion, so a final status is never lost.
+    """
+
+    def __init__(self):
+        self._pending: "OrderedDict[int, dict]" = OrderedDict()
+        self._ready = asyncio.Event()
+
+    def push(self, event: dict):
+        self._pending.pop(event["id"], None)
+        self._pending[event["id"]] = event
+        self._ready.set()
+
+    async def next(self) -> List[dict]:
+        await self._ready.wait()
+        self._ready.clear()
+        events = list(self._pending.values())
+        self._pending.clear()
+        return events
+
+
+class ProgressBroadcaster:
+    """Fans progress events from Redis out to the clients of this process.
+
+    One Redis subscription is shared by all clients and only held while at
+    least one is connected.
+    """
+
+    RECONNECT_SECONDS = 1.0
+
+    def __init__(self, redis_url: str, channel: str):
+        self.redis_url = redis_url
+        self.channel = channel
+        self._subscribers: Set[EventSubscriber] = set()
+        self._listener: Optional[asyncio.Task] = None
+
+    async def _listen(self):
+        while True:
+            client = aioredis.Redis.from_url(self.redis_url)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    event = self._decode(message["data"])
+                    if event is None:
+                        continue
+                    for subscriber in self._subscribers:
+                        subscriber.push(event)
+            except (redis.RedisError, OSError):
+                logger.warning("Progress subscription lost, reconnecting", exc_info=True)
+                await asyncio.sleep(self.RECONNECT_SECONDS)
+            finally:
+                await pubsub.close()
+                await client.close()
+
+    @staticmethod
+    def _decode(data) -> Optional[dict]:
+        """The event in a message, or None for one that is not a progress event."""
+        try:
+            event = json.loads(data)
+        except ValueError:
+            logger.warning("Skipping undecodable message on the progress channel: %.200r", data)
+            return None
+        if not isinstance(event, dict) or "id" not in event:
+            logger.warning("Skipping message without a conversion id on the progress channel: %.200r", data)
+            return None
+        return event
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[EventSubscriber]:
+        subscriber = EventSubscriber()
+        self._subscribers.add(subscriber)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        try:
+            yield subscriber
+        finally:
+            self._subscribers.discard(subscriber)
+            if not self._subscribers and self._listener:
+                self._listener.cancel()
+                self._listener = None
+
+
+# Singleton instance
+_progress_broadcaster: Optional[ProgressBroadcaster] = None
+
+
+def get_progress_broadcaster() -> ProgressBroadcaster:
+    global _progress_broadcaster
+    if _progress_broadcaster is None:
+        settings = get_settings()
+        _progress_broadcaster = ProgressBroadcaster(settings.redis_url, settings.progress_channel)
+    return _progress_broadcaster
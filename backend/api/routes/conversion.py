@@ -1,20 +1,76 @@
-from typing import List, Optional
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Query
+from typing import Iterable, List, Optional, Tuple
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 from models.database import get_db
 from models.conversion import Conversion, ConversionStatus
-from api.schemas.conversion import ConversionResponse, ConversionCreate
-from tasks.conversion_tasks import convert_to_audiobook
+from api.schemas.conversion import ConversionResponse, ConversionCreate, ConversionSummary
+from api.events import get_progress_broadcaster
+from tasks.checkpoint import ConversionCheckpoint
+from tasks.progress import publish_progress
+from tasks.scheduling import classify, estimate_chars, release_waiting, submit
 from celery_app import celery_app
+from storage.uploads import (
+    UploadTooLarge, blob_lock, discard_upload, publish_upload, remove_blob, store_upload
+)
 from config import get_settings
+from datetime import datetime
+import asyncio
+import base64
+import json
 import os
-import shutil
 
 router = APIRouter()
 settings = get_settings()
 
+# Comment lines keep idle event streams from being closed by proxies
+EVENTS_KEEPALIVE_SECONDS = 15
+CLEAR_BATCH_SIZE = 1000
+# Set by an authenticating proxy; otherwise submitters are told apart by address
+SUBMITTER_HEADER = "X-Submitter"
+
+
+def _release_uploads(db: Session, uploads: Iterable[Tuple[str, str]]):
+    """Delete stored uploads that no remaining conversion references."""
+    for content_hash, file_format in set(uploads):
+        # Under the lock, an upload of the same bytes either committed its
+        # row before the check or restores the blob after the removal
+        with blob_lock(settings.upload_dir):
+            still_used = db.query(Conversion.id).filter(Conversion.content_hash == content_hash).first()
+            if not still_used:
+                remove_blob(settings.upload_dir, content_hash, file_format)
+
+
+def _submitter(request: Request) -> Optional[str]:
+    return request.headers.get(SUBMITTER_HEADER) or (request.client.host if request.client else None)
+
+
+def _enqueue(db: Session, conversion: Conversion, staged_path: Optional[str] = None) -> Conversion:
+    """Queue the conversion, or leave it waiting if its submitter has enough queued.
+
+    A new upload's staged file is published as its blob once the row
+    referencing it is committed, before any worker can read it.
+
+    Blocks on the database and the broker, so async routes run it in the
+    thread pool. The conversion is refreshed here so serializing it later
+    does not lazy-load on the event loop.
+    """
+    db.add(conversion)
+    db.commit()
+    if staged_path:
+        publish_upload(settings.upload_dir, conversion.content_hash, conversion.file_format, staged_path)
+
+    submit(db, conversion)
+    db.refresh(conversion)
+    publish_progress(conversion)
+    return conversion
+
+
 @router.post("/upload", response_model=ConversionResponse)
 async def upload_file(
+    request: Request,
     file: UploadFile = File(...),
     voice_id: Optional[str] = Form(None),
     db: Session = Depends(get_db)
@@ -25,44 +81,86 @@ async def upload_file(
     if file_ext.lower() not in supported_formats:
         raise HTTPException(status_code=400, detail="Unsupported file format")
     
-    os.makedirs(settings.upload_dir, exist_ok=True)
-    
-    file_path = os.path.join(settings.upload_dir, file.filename)
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    conversion = Conversion(
-        filename=file.filename,
-        file_format=file_ext,
-        voice_id=voice_id,
-        status=ConversionStatus.PENDING
-    )
-    
-    db.add(conversion)
-    db.commit()
-    db.refresh(conversion)
-    
-    task = convert_to_audiobook.delay(conversion.id)
-    conversion.task_id = task.id
-    db.commit()
-    
-    return conversion
+    # Identical bytes share one blob, so a new upload can never overwrite the
+    # file a queued job is about to read. Copying hundreds of megabytes runs
+    # in the thread pool so other requests are served meanwhile.
+    try:
+        content_hash, _, staged_path = await run_in_threadpool(
+            store_upload, file.file, settings.upload_dir, file_ext, settings.max_file_size
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    try:
+        # Sized up front so short jobs get their own lane
+        estimated_chars = await run_in_threadpool(estimate_chars, staged_path, file_ext)
+
+        conversion = Conversion(
+            filename=file.filename,
+            content_hash=content_hash,
+            file_format=file_ext,
+            voice_id=voice_id,
+            status=ConversionStatus.PENDING,
+            submitter=_submitter(request),
+            lane=classify(estimated_chars),
+            estimated_chars=estimated_chars
+        )
+        return await run_in_threadpool(_enqueue, db, conversion, staged_path)
+    finally:
+        # Left over only if the upload failed before it was published
+        discard_upload(staged_path)
+
+# Columns ConversionSummary is built from
+LIST_COLUMNS = (
+    Conversion.id, Conversion.filename, Conversion.status, Conversion.progress,
+    Conversion.output_path, Conversion.created_at, Conversion.started_at,
+    Conversion.chunks_total, Conversion.chunks_completed
+)
+
+
+def _encode_cursor(created_at: datetime, conversion_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), conversion_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
 
-@router.get("/list", response_model=List[ConversionResponse])
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, conversion_id = json.loads(payload)
+        return datetime.fromisoformat(created_at), int(conversion_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/list", response_model=List[ConversionSummary])
 async def list_conversions(
+    response: Response,
     active_only: bool = Query(True, description="Only return active conversions"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     db: Session = Depends(get_db)
 ):
-    query = db.query(Conversion).order_by(Conversion.created_at.desc())
+    """Conversions, newest first, one page at a time.
+
+    When more remain, the X-Next-Cursor header holds the cursor for the
+    next page. Pages are keyed on (created_at, id), so they stay consistent
+    while conversions are added and every page is an index range scan.
+    """
+    query = db.query(*LIST_COLUMNS)
 
     if active_only:
         query = query.filter(
             Conversion.status.in_([ConversionStatus.PENDING, ConversionStatus.PROCESSING])
         )
+    if cursor:
+        query = query.filter(tuple_(Conversion.created_at, Conversion.id) < _decode_cursor(cursor))
 
-    conversions = query.limit(50).all()
-    return [ConversionResponse.from_orm_with_eta(c) for c in conversions]
+    rows = query.order_by(Conversion.created_at.desc(), Conversion.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return [ConversionSummary.from_row(row) for row in rows]
 
 @router.get("/status/{conversion_id}", response_model=ConversionResponse)
 async def get_status(conversion_id: int, db: Session = Depends(get_db)):
@@ -73,6 +171,33 @@ async def get_status(conversion_id: int, db: Session = Depends(get_db)):
 
     return ConversionResponse.from_orm_with_eta(conversion)
 
+@router.get("/events")
+async def conversion_events(conversion_id: Optional[int] = None):
+    """Server-sent events with the state of conversions as it changes.
+
+    Each event is a ConversionResponse. Workers publish one per finished
+    chunk, so clients need not poll /list or /status.
+    """
+    async def stream():
+        async with get_progress_broadcaster().subscribe() as subscriber:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    events = await asyncio.wait_for(subscriber.next(), EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                for event in events:
+                    if conversion_id is None or event["id"] == conversion_id:
+                        yield f"data: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/cancel/{conversion_id}", response_model=ConversionResponse)
 async def cancel_conversion(conversion_id: int, db: Session = Depends(get_db)):
     conversion = db.query(Conversion).filter(Conversion.id == conversion_id).first()
@@ -83,43 +208,109 @@ async def cancel_conversion(conversion_id: int, db: Session = Depends(get_db)):
     if conversion.status in [ConversionStatus.COMPLETED, ConversionStatus.FAILED, ConversionStatus.CANCELLED]:
         raise HTTPException(status_code=400, detail="Conversion cannot be cancelled")
 
+    return await run_in_threadpool(_cancel, db, conversion)
+
+
+def _cancel(db: Session, conversion: Conversion) -> Conversion:
+    """Revoke the conversion's task and mark it cancelled.
+
+    Blocks on the broker, the database and Redis, so it runs in the thread
+    pool like _enqueue, which it also follows in refreshing the conversion.
+    """
     if conversion.task_id:
         celery_app.control.revoke(conversion.task_id, terminate=True)
 
+    was_queued = conversion.status == ConversionStatus.PENDING and conversion.task_id
     conversion.status = ConversionStatus.CANCELLED
     db.commit()
     db.refresh(conversion)
-
+    publish_progress(conversion)
+    if was_queued:
+        release_waiting(db, conversion.submitter, conversion.lane)
+        db.refresh(conversion)
     return conversion
 
 
+@router.post("/resume/{conversion_id}", response_model=ConversionResponse)
+async def resume_conversion(conversion_id: int, db: Session = Depends(get_db)):
+    """Re-queue a failed or cancelled conversion, skipping chunks already done"""
+    conversion = db.query(Conversion).filter(Conversion.id == conversion_id).first()
+
+    if not conversion:
+        raise HTTPException(status_code=404, detail="Conversion not found")
+
+    if conversion.status not in [ConversionStatus.FAILED, ConversionStatus.CANCELLED]:
+        raise HTTPException(status_code=400, detail="Only failed or cancelled conversions can be resumed")
+
+    conversion.status = ConversionStatus.PENDING
+    conversion.error_message = None
+    conversion.failed_chunks = None
+    # Not queued until _enqueue says so
+    conversion.task_id = None
+    conversion = await run_in_threadpool(_enqueue, db, conversion)
+
+    return ConversionResponse.from_orm_with_eta(conversion)
+
+
 @router.post("/cancel-all")
 async def cancel_all_conversions(db: Session = Depends(get_db)):
     """Cancel all pending and processing conversions"""
     active_conversions = db.query(Conversion).filter(
         Conversion.status.in_([ConversionStatus.PENDING, ConversionStatus.PROCESSING])
     ).all()
+    return {"cancelled": await run_in_threadpool(_cancel_all, db, active_conversions)}
+
 
+def _cancel_all(db: Session, conversions: List[Conversion]) -> int:
     cancelled_count = 0
-    for conversion in active_conversions:
+    for conversion in conversions:
         if conversion.task_id:
             celery_app.control.revoke(conversion.task_id, terminate=True)
         conversion.status = ConversionStatus.CANCELLED
         cancelled_count += 1
 
     db.commit()
-    return {"cancelled": cancelled_count}
+    for conversion in conversions:
+        publish_progress(conversion)
+    return cancelled_count
 
 
 @router.delete("/clear-completed")
 async def clear_completed_conversions(db: Session = Depends(get_db)):
     """Remove all completed, failed, and cancelled conversions from database"""
-    deleted = db.query(Conversion).filter(
-        Conversion.status.in_([ConversionStatus.COMPLETED, ConversionStatus.FAILED, ConversionStatus.CANCELLED])
-    ).delete(synchronize_session=False)
+    return {"deleted": await run_in_threadpool(_clear_finished, db)}
 
-    db.commit()
-    return {"deleted": deleted}
+
+def _clear_finished(db: Session) -> int:
+    """Delete every finished conversion with its checkpoint and unused upload.
+
+    Blocks on the database and the filesystem, so it runs in the thread pool.
+    """
+    finished = Conversion.status.in_([ConversionStatus.COMPLETED, ConversionStatus.FAILED, ConversionStatus.CANCELLED])
+
+    # Short transactions of CLEAR_BATCH_SIZE rows instead of one that locks
+    # the whole history
+    uploads = []
+    deleted = 0
+    while True:
+        batch = db.query(
+            Conversion.id, Conversion.content_hash, Conversion.file_format
+        ).filter(finished).order_by(Conversion.id).limit(CLEAR_BATCH_SIZE).all()
+        if not batch:
+            break
+
+        for conversion_id, content_hash, file_format in batch:
+            ConversionCheckpoint(settings.checkpoint_dir, conversion_id).clear()
+            if content_hash:
+                uploads.append((content_hash, file_format))
+
+        deleted += db.query(Conversion).filter(
+            Conversion.id.in_([row.id for row in batch])
+        ).delete(synchronize_session=False)
+        db.commit()
+
+    _release_uploads(db, uploads)
+    return deleted
 
 
 @router.delete("/{conversion_id}")
@@ -134,6 +325,18 @@ async def delete_conversion(conversion_id: int, db: Session = Depends(get_db)):
     if conversion.status in [ConversionStatus.PENDING, ConversionStatus.PROCESSING]:
         raise HTTPException(status_code=400, detail="Cannot delete active conversion. Cancel it first.")
 
+    await run_in_threadpool(_delete, db, conversion)
+    return {"deleted": True}
+
+
+def _delete(db: Session, conversion: Conversion):
+    """Delete the conversion with its checkpoint and, if unused now, its upload.
+
+    Blocks on the database and the filesystem like _clear_finished.
+    """
+    ConversionCheckpoint(settings.checkpoint_dir, conversion.id).clear()
+    upload = (conversion.content_hash, conversion.file_format)
     db.delete(conversion)
     db.commit()
-    return {"deleted": True}
\ No newline at end of file
+    if upload[0]:
+        _release_uploads(db, [upload])
@@ -1,24 +1,22 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Request
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 from models.database import get_db
 from models.conversion import VoiceProfile
 from api.schemas.conversion import VoiceProfileResponse
+from tts.preview_store import get_preview_store
+from tts.voice_catalogue import get_voice_catalogue
+from tts.chunk_sizing import get_chunk_size_tuner
 from config import get_settings
 import os
 import shutil
-import asyncio
-import hashlib
-import edge_tts
-from typing import List
+from typing import List, Optional
+from urllib.parse import quote
 from pydantic import BaseModel
 
 router = APIRouter()
 settings = get_settings()
 
-# Preview text for voice samples
-PREVIEW_TEXT = "Hello! This is a preview of my voice. I can read your books and documents aloud."
-
 class EdgeVoice(BaseModel):
     id: str
     name: str
@@ -85,56 +83,61 @@ async def list_voices(db: Session = Depends(get_db)):
 
 
 @router.get("/edge-voices", response_model=List[EdgeVoice])
-async def list_edge_voices(locale_filter: str = "en"):
-    """List available edge-tts voices, filtered by locale prefix."""
+async def list_edge_voices(locale_filter: str = "en", gender: Optional[str] = None):
+    """List voices of the configured TTS backend, filtered by locale prefix
+    and optionally gender. Sorted by locale, then by name."""
     try:
-        voices = await edge_tts.list_voices()
-
-        # Filter and transform voices
-        result = []
-        for v in voices:
-            if v["Locale"].startswith(locale_filter):
-                # Extract friendly name from ShortName (e.g., "en-US-AriaNeural" -> "Aria")
-                short_name = v["ShortName"]
-                name_parts = short_name.split("-")
-                friendly_name = name_parts[2].replace("Neural", "").replace("Multilingual", " (Multi)")
-
-                result.append(EdgeVoice(
-                    id=short_name,
-                    name=friendly_name,
-                    gender=v["Gender"],
-                    locale=v["Locale"],
-                    locale_name=get_locale_name(v["Locale"])
-                ))
-
-        # Sort by locale, then by name
-        result.sort(key=lambda x: (x.locale, x.name))
-        return result
+        voices = await get_voice_catalogue().voices(locale_filter, gender)
+
+        return [
+            EdgeVoice(
+                id=v["id"],
+                name=v["name"],
+                gender=v["gender"],
+                locale=v["locale"],
+                locale_name=get_locale_name(v["locale"])
+            )
+            for v in voices
+        ]
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch voices: {str(e)}")
 
 
+@router.get("/chunk-sizing")
+async def get_chunk_sizing():
+    """Chunk sizes learned from TTS latency, with the measurements behind them."""
+    sizing = get_chunk_size_tuner()
+    if not sizing:
+        return {"enabled": False, "chunk_chars": settings.chunk_max_chars, "voices": {}}
+
+    return {
+        "enabled": True,
+        "min_chars": sizing.min_chars,
+        "max_chars": sizing.max_chars,
+        "voices": sizing.snapshot(),
+    }
+
+
+# Preview clips only change with the engine, voice or text, all part of the ETag
+PREVIEW_CACHE_CONTROL = "public, max-age=86400"
+
+
 @router.get("/preview/{voice_id}")
-async def get_voice_preview(voice_id: str):
+async def get_voice_preview(voice_id: str, request: Request):
     """Generate or return cached preview audio for a voice."""
-    # Create preview cache directory
-    preview_dir = os.path.join(settings.voices_dir, "previews")
-    os.makedirs(preview_dir, exist_ok=True)
-
-    # Create a hash-based filename for caching
-    preview_file = os.path.join(preview_dir, f"{voice_id}.mp3")
-
-    # Generate preview if not cached
-    if not os.path.exists(preview_file):
-        try:
-            communicate = edge_tts.Communicate(PREVIEW_TEXT, voice_id)
-            await communicate.save(preview_file)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to generate preview: {str(e)}")
-
-    return FileResponse(
-        preview_file,
-        media_type="audio/mpeg",
-        filename=f"{voice_id}_preview.mp3"
-    )
\ No newline at end of file
+    store = get_preview_store()
+    etag = store.etag(voice_id)
+    headers = {"ETag": etag, "Cache-Control": PREVIEW_CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    try:
+        preview = await store.get(voice_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate preview: {str(e)}")
+
+    headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quote(f'{voice_id}_preview.mp3')}"
+    return Response(content=preview, media_type="audio/mpeg", headers=headers)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from models.conversion import ConversionStatus
 
@@ -18,6 +18,9 @@ class ConversionResponse(BaseModel):
     chunks_total: Optional[int]
     chunks_completed: Optional[int]
     estimated_seconds_remaining: Optional[float] = None
+    extraction_stats: Optional[dict] = None
+    failed_chunks: Optional[List[dict]] = None
+    lane: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -35,19 +38,55 @@ class ConversionResponse(BaseModel):
             "started_at": conversion.started_at,
             "chunks_total": conversion.chunks_total,
             "chunks_completed": conversion.chunks_completed,
-            "estimated_seconds_remaining": None
+            "estimated_seconds_remaining": estimate_seconds_remaining(conversion),
+            "extraction_stats": conversion.extraction_stats,
+            "failed_chunks": conversion.failed_chunks,
+            "lane": conversion.lane
         }
 
-        if (conversion.started_at and conversion.chunks_completed
-                and conversion.chunks_completed > 0 and conversion.chunks_total):
-            from datetime import datetime, timezone
-            elapsed = (datetime.now(timezone.utc) - conversion.started_at).total_seconds()
-            avg_chunk_time = elapsed / conversion.chunks_completed
-            remaining_chunks = conversion.chunks_total - conversion.chunks_completed
-            data["estimated_seconds_remaining"] = remaining_chunks * avg_chunk_time
-
         return cls(**data)
 
+class ConversionSummary(BaseModel):
+    """The columns the conversion list shows, without the bulky text and JSON ones."""
+    id: int
+    filename: str
+    status: ConversionStatus
+    progress: float
+    output_path: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    chunks_total: Optional[int]
+    chunks_completed: Optional[int]
+    estimated_seconds_remaining: Optional[float] = None
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from a result row holding exactly the columns above."""
+        return cls(**row._mapping, estimated_seconds_remaining=estimate_seconds_remaining(row))
+
+def estimate_seconds_remaining(conversion) -> Optional[float]:
+    """Extrapolate the time left from the average time per finished chunk.
+
+    While the book is still being extracted the chunk count is unknown, so
+    the progress made so far is extrapolated instead.
+    """
+    if not (conversion.started_at and conversion.chunks_completed and conversion.chunks_completed > 0):
+        return None
+    if not conversion.chunks_total and not conversion.progress:
+        return None
+
+    from datetime import timezone
+    started_at = conversion.started_at
+    if started_at.tzinfo is None:
+        # Set from utcnow() and read back naive by SQLite
+        started_at = started_at.replace(tzinfo=timezone.utc)
+    elapsed = (datetime.now(timezone.utc) - started_at).total_seconds()
+    if not conversion.chunks_total:
+        return elapsed * (100 - conversion.progress) / conversion.progress
+    avg_chunk_time = elapsed / conversion.chunks_completed
+    remaining_chunks = conversion.chunks_total - conversion.chunks_completed
+    return remaining_chunks * avg_chunk_time
+
 class VoiceProfileResponse(BaseModel):
     id: int
     name: str
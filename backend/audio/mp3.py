@@ -0,0 +1,162 @@
+from typing import NamedTuple, Optional, Tuple
+
+# Bitrates in kbps indexed by [version_key][layer][bitrate_index]
+_BITRATES = {
+    "1": {
+        1: (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+        2: (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+        3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    },
+    "2": {
+        1: (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+        2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+        3: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    },
+}
+
+_SAMPLE_RATES = {
+    "1": (44100, 48000, 32000),
+    "2": (22050, 24000, 16000),
+    "2.5": (11025, 12000, 8000),
+}
+
+_VERSIONS = {0b00: "2.5", 0b10: "2", 0b11: "1"}
+_LAYERS = {0b01: 3, 0b10: 2, 0b11: 1}
+
+# Tags written by encoders into the first frame to describe the whole file.
+# Such a frame is wrong once files are concatenated, so it is dropped.
+_VBR_TAGS = (b"Xing", b"Info", b"VBRI")
+
+
+class FrameHeader(NamedTuple):
+    version: str
+    layer: int
+    bitrate: int
+    sample_rate: int
+    channels: int
+    frame_length: int
+
+    @property
+    def seconds(self) -> float:
+        """Playing time of one frame."""
+        if self.layer == 1:
+            samples = 384
+        elif self.layer == 3 and self.version != "1":
+            samples = 576
+        else:
+            samples = 1152
+        return samples / self.sample_rate
+
+    def is_compatible(self, other: "FrameHeader") -> bool:
+        """Frames can be appended to a stream of `other` without re-encoding."""
+        return (
+            self.version == other.version
+            and self.layer == other.layer
+            and self.sample_rate == other.sample_rate
+            and self.channels == other.channels
+        )
+
+
+def parse_frame_header(data: bytes, offset: int = 0) -> Optional[FrameHeader]:
+    """Parse the 4-byte MPEG audio frame header at offset, or return None."""
+    if offset + 4 > len(data):
+        return None
+
+    b1, b2, b3, b4 = data[offset:offset + 4]
+    if b1 != 0xFF or (b2 & 0xE0) != 0xE0:
+        return None
+
+    version = _VERSIONS.get((b2 >> 3) & 0b11)
+    layer = _LAYERS.get((b2 >> 1) & 0b11)
+    bitrate_index = (b3 >> 4) & 0x0F
+    sample_rate_index = (b3 >> 2) & 0b11
+    if version is None or layer is None or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    bitrate = _BITRATES["1" if version == "1" else "2"][layer][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    padding = (b3 >> 1) & 1
+    channels = 1 if (b4 >> 6) == 0b11 else 2
+
+    if layer == 1:
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 3 and version != "1":
+        frame_length = 72 * bitrate // sample_rate + padding
+    else:
+        frame_length = 144 * bitrate // sample_rate + padding
+
+    return FrameHeader(version, layer, bitrate, sample_rate, channels, frame_length)
+
+
+def _id3v2_size(data: bytes) -> int:
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def find_audio_frames(data: bytes) -> Optional[Tuple[FrameHeader, int, int]]:
+    """Locate the MPEG audio frames inside an MP3 file's bytes.
+
+    Returns (first frame header, start offset, end offset) with ID3 tags and
+    any VBR info frame excluded, or None if no audio frames are found.
+    """
+    end = len(data)
+    if end >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+
+    offset = _id3v2_size(data)
+    while True:
+        offset = data.find(b"\xff", offset, end)
+        if offset < 0:
+            return None
+
+        header = parse_frame_header(data, offset)
+        if header:
+            following = offset + header.frame_length
+            # Require a second frame header to rule out a false sync
+            if following >= end or parse_frame_header(data, following):
+                break
+        offset += 1
+
+    frame = data[offset:offset + min(header.frame_length, 64)]
+    if any(tag in frame for tag in _VBR_TAGS):
+        offset += header.frame_length
+        next_header = parse_frame_header(data, offset)
+        if next_header:
+            header = next_header
+
+    return header, offset, end
+
+
+def frames_duration(frames) -> float:
+    """Playing time of consecutive audio frames, e.g. as find_audio_frames
+    locates them or an output built from those."""
+    seconds = 0.0
+    offset = 0
+    while True:
+        header = parse_frame_header(frames, offset)
+        if header is None:
+            return seconds
+        seconds += header.seconds
+        offset += header.frame_length
+
+
+# MPEG-2 Layer III, 48 kbps, 24 kHz, mono: the format edge-tts produces.
+# 72 * 48000 / 24000 = 144 bytes per frame, 576 samples (24 ms) per frame.
+SILENT_FRAME_HEADER = bytes([0xFF, 0xF3, 0x64, 0xC0])
+SILENT_FRAME_LENGTH = 144
+SILENT_FRAME_SECONDS = 576 / 24000
+
+
+def silent_mp3(seconds: float) -> bytes:
+    """Build a valid MP3 of the given duration from all-zero frames.
+
+    Zeroed side info means no main data, which decoders play as silence, so
+    this needs no encoder and matches edge-tts output byte for byte in size.
+    """
+    frame = SILENT_FRAME_HEADER + bytes(SILENT_FRAME_LENGTH - len(SILENT_FRAME_HEADER))
+    return frame * max(1, round(seconds / SILENT_FRAME_SECONDS))
@@ -1,25 +1,322 @@
 from pydub import AudioSegment
-from typing import List
+from typing import BinaryIO, Dict, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+import io
+import mmap
 import os
+import subprocess
+from audio.mp3 import FrameHeader, find_audio_frames, frames_duration
+
+
+class OutputProfile(NamedTuple):
+    extension: str
+    # ffmpeg encoder, or None to keep the merged MP3 as it is
+    codec: Optional[str]
+    bitrate: Optional[str]
+    args: Tuple[str, ...] = ()
+
+
+# Speech is mono and needs far less than music; edge-tts itself sends 48 kbps
+# MP3. The MP4 profiles put the index up front so players can seek straight
+# to a chapter before the whole file has arrived.
+OUTPUT_PROFILES = {
+    "mp3": OutputProfile(".mp3", None, None),
+    "m4b-aac": OutputProfile(".m4b", "aac", "32k", ("-ac", "1", "-movflags", "+faststart", "-f", "ipod")),
+    "m4b-opus": OutputProfile(
+        ".m4b", "libopus", "24k", ("-application", "voip", "-ac", "1", "-movflags", "+faststart", "-f", "mp4")
+    ),
+    "opus": OutputProfile(".opus", "libopus", "24k", ("-application", "voip", "-ac", "1", "-f", "ogg")),
+}
+
+
+def get_output_profile(name: str) -> OutputProfile:
+    try:
+        return OUTPUT_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown output profile: {name}")
+
+
+def _ffmetadata_escape(value: str) -> str:
+    for char in ("\\", "=", ";", "#", "\n"):
+        value = value.replace(char, "\\" + char)
+    return value
+
+
+def ffmetadata(title: Optional[str], chapters: Sequence[Tuple[str, float, float]]) -> str:
+    """An ffmpeg metadata file with the book title and (title, start, end) chapters in seconds."""
+    lines = [";FFMETADATA1"]
+    if title:
+        lines.append(f"title={_ffmetadata_escape(title)}")
+    for chapter_title, start, end in chapters:
+        lines += [
+            "[CHAPTER]",
+            "TIMEBASE=1/1000",
+            f"START={round(start * 1000)}",
+            f"END={round(end * 1000)}",
+            f"title={_ffmetadata_escape(chapter_title)}",
+        ]
+    return "\n".join(lines) + "\n"
+
 
 class AudioProcessor:
     @staticmethod
-    def merge_audio_files(file_paths: List[str], output_path: str) -> str:
+    def merge_audio_files(file_paths: List[str], output_path: str, streaming: bool = True) -> str:
+        if streaming:
+            return AudioProcessor.merge_audio_files_streaming(file_paths, output_path)
+
         combined = AudioSegment.empty()
-        
+
         for file_path in file_paths:
             audio = AudioSegment.from_file(file_path)
             combined += audio
-        
+
         combined.export(output_path, format="mp3", bitrate="128k")
-        
+
         for file_path in file_paths:
             os.remove(file_path)
-        
+
         return output_path
-    
+
+    @staticmethod
+    def merge_audio_files_streaming(file_paths: List[str], output_path: str) -> str:
+        """Concatenate MP3 chunks frame by frame without decoding them.
+
+        Only one chunk is held in memory at a time, so peak memory does not
+        grow with the length of the book. Chunks whose stream parameters
+        differ from the first one are re-encoded individually to match.
+        """
+        reference = None
+
+        with open(output_path, "wb") as output:
+            for file_path in file_paths:
+                reference = AudioProcessor.append_mp3(file_path, output, reference)
+                os.remove(file_path)
+
+        return output_path
+
+    @staticmethod
+    def append_mp3(
+        file_path: str,
+        output: BinaryIO,
+        reference: Optional[FrameHeader] = None
+    ) -> Optional[FrameHeader]:
+        """Append the audio frames of one MP3 file to an open output stream.
+
+        Returns the frame header the output stream is using, which should be
+        passed back in for the next file.
+        """
+        frames, reference = AudioProcessor.mp3_frames(file_path, reference)
+        output.write(frames)
+        return reference
+
+    @staticmethod
+    def mp3_frames(file_path: str, reference: Optional[FrameHeader] = None) -> Tuple[memoryview, FrameHeader]:
+        """The audio frames of one MP3 file, ready to follow frames like
+        `reference`, and the frame header of the stream they continue."""
+        with open(file_path, "rb") as f:
+            data = f.read()
+
+        frames = find_audio_frames(data)
+        if frames and (reference is None or frames[0].is_compatible(reference)):
+            header, start, end = frames
+            return memoryview(data)[start:end], reference or header
+
+        # Not MP3, or different sample rate/channels: transcode this chunk only
+        audio = AudioSegment.from_file(file_path)
+        bitrate = "128k"
+        if reference:
+            audio = audio.set_frame_rate(reference.sample_rate).set_channels(reference.channels)
+            bitrate = f"{reference.bitrate // 1000}k"
+
+        buffer = io.BytesIO()
+        audio.export(buffer, format="mp3", bitrate=bitrate)
+        data = buffer.getvalue()
+
+        frames = find_audio_frames(data)
+        if not frames:
+            raise ValueError(f"Could not encode {file_path} as MP3")
+        header, start, end = frames
+        return memoryview(data)[start:end], reference or header
+
     @staticmethod
     def convert_to_mp3(input_path: str, output_path: str) -> str:
         audio = AudioSegment.from_file(input_path)
         audio.export(output_path, format="mp3", bitrate="128k")
-        return output_path
\ No newline at end of file
+        return output_path
+
+    @staticmethod
+    def encode_audiobook(
+        input_path: str,
+        output_path: str,
+        profile: OutputProfile,
+        chapters: Sequence[Tuple[str, float, float]] = (),
+        title: Optional[str] = None,
+        bitrate: Optional[str] = None,
+        ffmpeg_binary: str = "ffmpeg"
+    ) -> str:
+        """Transcode a merged MP3 into an output profile with chapter markers.
+
+        Chapters are (title, start, end) in seconds. The output only appears
+        once ffmpeg succeeded, so a failed encode leaves nothing half written.
+        """
+        metadata_path = f"{output_path}.ffmeta"
+        partial_path = f"{output_path}.part"
+        with open(metadata_path, "w", encoding="utf-8") as f:
+            f.write(ffmetadata(title, chapters))
+
+        command = [
+            ffmpeg_binary, "-loglevel", "error", "-y", "-i", input_path, "-i", metadata_path,
+            "-map", "0:a", "-map_metadata", "1", "-map_chapters", "1",
+            "-c:a", profile.codec, "-b:a", bitrate or profile.bitrate, *profile.args, partial_path,
+        ]
+        try:
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0:
+                message = result.stderr.strip().splitlines()[-1:] or ["no output"]
+                raise RuntimeError(f"{ffmpeg_binary} exited with {result.returncode}: {message[0]}")
+            os.replace(partial_path, output_path)
+        finally:
+            for path in (metadata_path, partial_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        return output_path
+
+
+class ChunkAppender:
+    """Append chunk MP3s to an output file in index order as they finish.
+
+    Chunks that arrive early wait in a reorder buffer until every chunk before
+    them has been written. The output is flushed after each append, so the
+    file on disk is always a playable prefix of the final audiobook.
+
+    The start time of every chunk is kept in `starts`, and in timeline_path
+    as "index start end" lines so a resumed run still has them. A run only
+    resumes the output if its size and playing time still match those; a
+    fresh one is started otherwise.
+    """
+
+    # Seconds the resumed output and its timeline may differ by in rounding
+    DURATION_TOLERANCE = 0.005
+
+    def __init__(
+        self,
+        output_path: str,
+        start_index: int = 0,
+        start_offset: int = 0,
+        timeline_path: Optional[str] = None
+    ):
+        self.output_path = output_path
+        self.next_index = start_index
+        self._pending: Dict[int, str] = {}
+        self._reference: Optional[FrameHeader] = None
+        self.starts: Dict[int, float] = {}
+        # Playing time of the output so far
+        self.duration = 0.0
+        self._timeline: Optional[TextIO] = None
+
+        # Without a timeline there is nothing to check the output against
+        kept = self._read_timeline(timeline_path, start_index) if timeline_path else ()
+        if start_index and self._matches_checkpoint(start_offset, kept):
+            # Resume: drop anything written after the last known good append
+            self._output = open(output_path, "r+b")
+            self._output.truncate(start_offset)
+            self._output.seek(start_offset)
+            with open(output_path, "rb") as f:
+                frames = find_audio_frames(f.read(65536))
+            if frames:
+                self._reference = frames[0]
+            if kept:
+                self.starts = {index: start for index, start, _ in kept}
+                self.duration = kept[-1][2]
+            else:
+                self.duration = self._output_duration()
+        else:
+            # Nothing usable to resume from, callers must check next_index
+            self.next_index = 0
+            kept = []
+            self._output = open(output_path, "wb")
+
+        if timeline_path:
+            self._timeline = open(timeline_path, "w", encoding="utf-8")
+            self._timeline.writelines(f"{index} {start} {end}\n" for index, start, end in kept)
+            self._timeline.flush()
+
+    @staticmethod
+    def _read_timeline(timeline_path: str, start_index: int) -> Optional[List[Tuple[int, float, float]]]:
+        """Timeline entries of the first start_index chunks, None unless all are there."""
+        entries = {}
+        if start_index and os.path.exists(timeline_path):
+            with open(timeline_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        index, start, end = line.split()
+                        entries[int(index)] = (float(start), float(end))
+                    except ValueError:
+                        # Torn last line from a crash
+                        continue
+
+        if any(index not in entries for index in range(start_index)):
+            return None
+        return [(index, *entries[index]) for index in range(start_index)]
+
+    def _matches_checkpoint(self, start_offset: int, kept: Optional[Sequence[Tuple[int, float, float]]]) -> bool:
+        """Whether the output still holds what the checkpoint says was appended.
+
+        Its first start_offset bytes must play as long as the kept timeline
+        says, which only the chunks this conversion appended do.
+        """
+        if (kept is None or not start_offset or not os.path.exists(self.output_path)
+                or os.path.getsize(self.output_path) < start_offset):
+            return False
+        if not kept:
+            return True
+        with open(self.output_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            with memoryview(data) as view, view[:start_offset] as written:
+                duration = frames_duration(written)
+        return abs(duration - kept[-1][2]) < self.DURATION_TOLERANCE
+
+    def _output_duration(self) -> float:
+        if self._output.tell() == 0:
+            return 0.0
+        with mmap.mmap(self._output.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return frames_duration(data)
+
+    def add(self, index: int, file_path: str) -> int:
+        """Queue a finished chunk; returns how many chunks were written."""
+        self._pending[index] = file_path
+        written = 0
+
+        while self.next_index in self._pending:
+            path = self._pending.pop(self.next_index)
+            frames, self._reference = AudioProcessor.mp3_frames(path, self._reference)
+            self._output.write(frames)
+            self._output.flush()
+            os.remove(path)
+
+            start = self.starts[self.next_index] = self.duration
+            self.duration += frames_duration(frames)
+            if self._timeline:
+                self._timeline.write(f"{self.next_index} {start} {self.duration}\n")
+                self._timeline.flush()
+            self.next_index += 1
+            written += 1
+
+        return written
+
+    @property
+    def bytes_written(self) -> int:
+        return self._output.tell()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def close(self):
+        self._output.close()
+        if self._timeline:
+            self._timeline.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
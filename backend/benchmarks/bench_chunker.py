@@ -0,0 +1,70 @@
+"""Benchmark TextChunker on a multi-megabyte synthetic book.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_chunker --megabytes 8
+
+Chunks the book as one string and streamed in page-sized pieces, both for
+ordinary prose and for text without sentence punctuation (as OCR often
+produces), which exercises the hard-split fallbacks.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from benchmarks.synthetic import sentences
+from tts.chunker import TextChunker
+
+PAGE_CHARS = 3000
+
+
+def make_book(megabytes: float, punctuated: bool = True) -> str:
+    line = "\n".join(sentences(50))
+    if not punctuated:
+        line = line.replace(".", "").replace(",", "")
+    copies = int(megabytes * 1024 * 1024 / len(line)) + 1
+    return "\n\n".join([line] * copies)
+
+
+def time_chunking(text: str, max_chars: int, streamed: bool) -> dict:
+    chunker = TextChunker(max_chars=max_chars)
+    parts = [text[i:i + PAGE_CHARS] for i in range(0, len(text), PAGE_CHARS)] if streamed else [text]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = 0
+    longest = 0
+    for chunk in chunker.iter_chunks(parts):
+        count += 1
+        longest = max(longest, len(chunk))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "streamed": streamed,
+        "seconds": round(elapsed, 3),
+        "mb_per_second": round(len(text) / 1024 / 1024 / elapsed, 2),
+        "chunks": count,
+        "longest_chunk": longest,
+        "peak_traced_mb": round(peak / 1024 / 1024, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=8)
+    parser.add_argument("--max-chars", type=int, default=500)
+    args = parser.parse_args()
+
+    result = {"megabytes": args.megabytes, "max_chars": args.max_chars}
+    for name, punctuated in (("prose", True), ("unpunctuated", False)):
+        book = make_book(args.megabytes, punctuated)
+        result[name] = [time_chunking(book, args.max_chars, streamed) for streamed in (False, True)]
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
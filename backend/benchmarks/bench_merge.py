@@ -0,0 +1,88 @@
+"""Compare memory and time of the pydub merge and the streaming merge.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_merge --chunks 2000 --seconds 30
+
+Each mode runs in a fresh interpreter so peak RSS is not shared between
+them. The pydub mode needs ffmpeg on PATH and is skipped without it.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import write_silent_chunks
+
+
+def peak_rss_bytes() -> int:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def run_mode(mode: str, chunks: int, seconds: float) -> dict:
+    from audio.processor import AudioProcessor
+
+    workdir = tempfile.mkdtemp(prefix="bench_merge_")
+    try:
+        paths = write_silent_chunks(workdir, chunks, seconds)
+        output_path = f"{workdir}/merged.mp3"
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        AudioProcessor.merge_audio_files(paths, output_path, streaming=(mode == "streaming"))
+        elapsed = time.perf_counter() - started
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            "mode": mode,
+            "chunks": chunks,
+            "audio_hours": round(chunks * seconds / 3600, 2),
+            "seconds": round(elapsed, 3),
+            "peak_python_bytes": traced_peak,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "output_bytes": os.path.getsize(output_path),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=30.0, help="Audio length of each chunk")
+    parser.add_argument("--mode", choices=["pydub", "streaming"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.chunks, args.seconds)))
+        return
+
+    results = []
+    for mode in ("streaming", "pydub"):
+        if mode == "pydub" and not shutil.which("ffmpeg"):
+            results.append({"mode": mode, "skipped": "ffmpeg not found"})
+            continue
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_merge", "--mode", mode,
+             "--chunks", str(args.chunks), "--seconds", str(args.seconds)],
+            capture_output=True, text=True, check=True
+        )
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark OCR of a synthetic scanned PDF with different worker counts.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_ocr --pages 40 --workers 1 4 8
+
+Also times the page-to-PIL step on its own, comparing the old PNG
+encode/decode round trip with wrapping the pixmap samples directly. The
+OCR runs need Tesseract and are skipped without it.
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import fitz
+from PIL import Image
+
+from benchmarks.synthetic import write_scanned_pdf
+from extractors.ocr import OCRProcessor
+from extractors.pdf_extractor import PDFExtractor
+
+
+def time_render(pdf_path: str) -> dict:
+    doc = fitz.open(pdf_path)
+    extractor = PDFExtractor(ocr_workers=1)
+    zoom = PDFExtractor.OCR_DPI / 72
+
+    started = time.perf_counter()
+    for page_num in range(len(doc)):
+        pix = doc[page_num].get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+        Image.open(io.BytesIO(pix.tobytes("png"))).load()
+    png_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for page_num in range(len(doc)):
+        extractor._render_page(doc[page_num])
+    direct_seconds = time.perf_counter() - started
+
+    doc.close()
+    return {"png_roundtrip_seconds": round(png_seconds, 3), "direct_seconds": round(direct_seconds, 3)}
+
+
+def time_ocr(pdf_path: str, workers: int) -> dict:
+    stats = {}
+    started = time.perf_counter()
+    chars = sum(len(text) for text in PDFExtractor(ocr_workers=workers).iter_extract(pdf_path, stats))
+    elapsed = time.perf_counter() - started
+    return {
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "pages_per_second": round(stats["pages"] / elapsed, 2),
+        "ocr_pages": stats["ocr_pages"],
+        "chars": chars,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_ocr_")
+    try:
+        pdf_path = os.path.join(workdir, "scanned.pdf")
+        write_scanned_pdf(pdf_path, args.pages)
+
+        result = {"pages": args.pages, "render": time_render(pdf_path)}
+        if OCRProcessor.is_tesseract_available():
+            result["ocr"] = [time_ocr(pdf_path, workers) for workers in args.workers]
+        else:
+            result["ocr"] = {"skipped": "tesseract not found"}
+
+        print(json.dumps(result, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""End-to-end benchmark of the conversion pipeline on synthetic books.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_pipeline --pages 100 --latency 0.05 --output run.json
+    python -m benchmarks.bench_pipeline --pages 100 --latency 0.05 --compare run.json
+
+Generates a book of --pages pages per format (text PDF, scanned PDF, EPUB,
+DOCX, FB2) and runs it through ExtractorFactory, TextChunker, TTSManager
+with the fake backend (silent audio after --latency seconds per request)
+and AudioProcessor.merge_audio_files, with the chunk and OCR caches off.
+Each format runs in a fresh interpreter so peak RSS is its own. The JSON
+report gives seconds per stage, throughput and peak RSS; --compare prints
+the change of every stage against an earlier report. The scanned PDF
+needs Tesseract and is skipped without it.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import synthetic
+from benchmarks.bench_merge import peak_rss_bytes
+
+FORMATS = {
+    "pdf": (".pdf", synthetic.write_text_pdf),
+    "scanned_pdf": (".pdf", synthetic.write_scanned_pdf),
+    "epub": (".epub", synthetic.write_epub),
+    "docx": (".docx", synthetic.write_docx),
+    "fb2": (".fb2", synthetic.write_fb2),
+}
+STAGES = ("extraction", "chunking", "synthesis", "merge")
+
+
+def configure_environment(workdir: str):
+    """Scratch settings without caches. Must run before the app is imported."""
+    os.environ.update(
+        DATABASE_URL=f"sqlite:///{workdir}/bench.sqlite",
+        REDIS_URL="redis://localhost:6379/0",
+        CELERY_BROKER_URL="memory://",
+        CELERY_RESULT_BACKEND="cache+memory://",
+        VOICE_CATALOGUE_PATH=os.path.join(workdir, "voices.json"),
+        TTS_BACKEND="fake",
+        OCR_CACHE_MAX_BYTES="0",
+    )
+
+
+def run_format(name: str, pages: int, latency: float, concurrency: int, max_chars: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    try:
+        configure_environment(workdir)
+        # Imported only now so the settings pick up the scratch environment
+        from audio.processor import AudioProcessor
+        from extractors.factory import ExtractorFactory
+        from tts.backends.fake_backend import FakeTTSBackend
+        from tts.chunker import TextChunker
+        from tts.tts_manager import TTSManager
+
+        extension, write_book = FORMATS[name]
+        book_path = os.path.join(workdir, "book" + extension)
+        write_book(book_path, pages)
+        stages = {}
+
+        started = time.perf_counter()
+        stats = {}
+        texts = list(ExtractorFactory.get_extractor(extension).iter_extract(book_path, stats))
+        stages["extraction"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        chunks = list(TextChunker(max_chars=max_chars).iter_chunks(texts))
+        stages["chunking"] = time.perf_counter() - started
+
+        chunk_dir = os.path.join(workdir, "chunks")
+        os.makedirs(chunk_dir)
+        paths = [os.path.join(chunk_dir, f"chunk_{idx}.mp3") for idx in range(len(chunks))]
+        manager = TTSManager(workdir, backend=FakeTTSBackend(latency=latency))
+        started = time.perf_counter()
+        manager.synthesize_many(chunks, paths, concurrency=concurrency)
+        stages["synthesis"] = time.perf_counter() - started
+
+        output_path = os.path.join(workdir, "book.mp3")
+        started = time.perf_counter()
+        AudioProcessor.merge_audio_files(paths, output_path)
+        stages["merge"] = time.perf_counter() - started
+
+        total = sum(stages.values())
+        chars = sum(len(chunk) for chunk in chunks)
+        audio_seconds = chars / FakeTTSBackend.CHARS_PER_SECOND
+        return {
+            "format": name,
+            "pages": pages,
+            "input_bytes": os.path.getsize(book_path),
+            "chars": chars,
+            "chunks": len(chunks),
+            "ocr_pages": stats.get("ocr_pages", 0),
+            "stage_seconds": {stage: round(stages[stage], 3) for stage in STAGES},
+            "total_seconds": round(total, 3),
+            "chars_per_second": round(chars / total, 1),
+            "pages_per_second": round(pages / total, 2),
+            # Hours of audio produced per hour of wall time
+            "realtime_factor": round(audio_seconds / total, 1),
+            "output_bytes": os.path.getsize(output_path),
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare(report: dict, baseline: dict) -> dict:
+    """Relative change of every stage and of the totals, per format."""
+    previous = {result["format"]: result for result in baseline["results"] if "skipped" not in result}
+    changes = {}
+    for result in report["results"]:
+        before = previous.get(result["format"])
+        if "skipped" in result or before is None:
+            continue
+        pairs = [(stage, result["stage_seconds"][stage], before["stage_seconds"][stage]) for stage in STAGES]
+        pairs += [(key, result[key], before[key]) for key in ("total_seconds", "peak_rss_bytes")]
+        changes[result["format"]] = {
+            key: f"{(now - then) / then:+.1%}" if then else None for key, now, then in pairs
+        }
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake TTS seconds per request")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-chars", type=int, default=500)
+    parser.add_argument("--formats", nargs="+", choices=list(FORMATS), default=list(FORMATS))
+    parser.add_argument("--output", help="Also write the report to this file")
+    parser.add_argument("--compare", help="Earlier report to compare against")
+    parser.add_argument("--format", choices=list(FORMATS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.format:
+        print(json.dumps(run_format(args.format, args.pages, args.latency, args.concurrency, args.max_chars)))
+        return
+
+    from extractors.ocr import OCRProcessor
+
+    results = []
+    for name in args.formats:
+        if name == "scanned_pdf" and not OCRProcessor.is_tesseract_available():
+            results.append({"format": name, "skipped": "tesseract not found"})
+            continue
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_pipeline", "--format", name,
+             "--pages", str(args.pages), "--latency", str(args.latency),
+             "--concurrency", str(args.concurrency), "--max-chars", str(args.max_chars)],
+            capture_output=True, text=True, check=True
+        )
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    report = {
+        "pages": args.pages,
+        "latency": args.latency,
+        "concurrency": args.concurrency,
+        "max_chars": args.max_chars,
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            report["compared_to"] = args.compare
+            report["changes"] = compare(report, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Exercise TTS retries and the circuit breaker against a faulty fake backend.
+
+Run from the backend directory:
+
+    python -m benchmarks.fault_injection --chunks 300 --error-rate 0.1 --max-rps 40
+
+The fake is a TTS backend that fails a share of requests
+with connection errors, answers 429 whenever more than --max-rps requests
+arrive within a second, and always fails chunks containing --poison. The
+report shows how many chunks made it, which ones were given up on, and how
+often the breaker opened.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from audio.mp3 import silent_mp3
+from benchmarks.synthetic import sentences
+from tts.backends.fake_backend import FakeTTSBackend
+from tts.resilience import CircuitBreaker, RetryPolicy
+from tts.tts_manager import TTSManager
+
+
+class RateLimited(Exception):
+    """Shaped like aiohttp's ClientResponseError for a throttled request."""
+
+    status = 429
+
+
+class FaultInjectingTTS(FakeTTSBackend):
+    """The fake backend with configurable failures."""
+
+    name = "fake-faulty"
+
+    def __init__(
+        self,
+        error_rate: float = 0.0,
+        max_rps: int = 0,
+        poison: str = "",
+        latency: float = 0.02,
+        seed: int = 0
+    ):
+        super().__init__(latency=latency)
+        self.error_rate = error_rate
+        self.max_rps = max_rps
+        self.poison = poison
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self._recent = []
+
+    async def synthesize(self, text: str, voice: str, output_path: str):
+        self.requests += 1
+        now = time.monotonic()
+        self._recent = [t for t in self._recent if now - t < 1.0]
+        self._recent.append(now)
+
+        await asyncio.sleep(self.latency)
+        if self.max_rps and len(self._recent) > self.max_rps:
+            self.throttled += 1
+            raise RateLimited("429 Too Many Requests")
+        if (self.poison and self.poison in text) or self.random.random() < self.error_rate:
+            self.errors += 1
+            raise ConnectionResetError("connection reset by fake backend")
+
+        with open(output_path, "wb") as f:
+            f.write(silent_mp3(len(text) / self.CHARS_PER_SECOND))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--max-rps", type=int, default=0)
+    parser.add_argument("--poison", default="")
+    parser.add_argument("--attempts", type=int, default=5)
+    parser.add_argument("--base-delay", type=float, default=0.05)
+    parser.add_argument("--cooldown", type=float, default=0.5)
+    args = parser.parse_args()
+
+    backend = FaultInjectingTTS(args.error_rate, args.max_rps, args.poison)
+    breaker = CircuitBreaker(failure_threshold=5, cooldown=args.cooldown, max_cooldown=args.cooldown * 8)
+    manager = TTSManager(
+        voices_dir="",
+        backend=backend,
+        retry=RetryPolicy(args.attempts, args.base_delay, args.base_delay * 32),
+        breaker=breaker
+    )
+
+    texts = sentences(args.chunks)
+    if args.poison:
+        texts[len(texts) // 2] = f"{texts[len(texts) // 2]} {args.poison}"
+
+    workdir = tempfile.mkdtemp(prefix="bench_faults_")
+    try:
+        paths = [os.path.join(workdir, f"chunk_{idx}.mp3") for idx in range(len(texts))]
+        failed = []
+
+        started = time.perf_counter()
+        manager.synthesize_many(
+            texts,
+            paths,
+            concurrency=args.concurrency,
+            failure_callback=lambda idx, path, exc: failed.append({"index": idx, "error": repr(exc)})
+        )
+        elapsed = time.perf_counter() - started
+
+        print(json.dumps({
+            "chunks": len(texts),
+            "succeeded": sum(1 for path in paths if os.path.exists(path)),
+            "failed": failed,
+            "seconds": round(elapsed, 2),
+            "requests": backend.requests,
+            "injected_errors": backend.errors,
+            "throttled": backend.throttled,
+            "breaker_opened": breaker.times_opened,
+        }, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+from audio.mp3 import silent_mp3
+
+
+def write_silent_chunks(directory: str, count: int, seconds: float, prefix: str = "chunk") -> list:
+    data = silent_mp3(seconds)
+    paths = []
+    for idx in range(count):
+        path = f"{directory}/{prefix}_{idx}.mp3"
+        with open(path, "wb") as f:
+            f.write(data)
+        paths.append(path)
+    return paths
+
+
+SAMPLE_SENTENCES = [
+    "The manuscript was carried across the valley in a cedar box.",
+    "Nobody in the village could read the curious script on its pages.",
+    "Every evening the scholar copied another folio by candlelight.",
+    "Botanical drawings filled the margins with roots and spiraling leaves.",
+    "Some said the text was a cipher, others that it was a forgotten tongue.",
+]
+
+
+def sentences(count: int) -> list:
+    return [SAMPLE_SENTENCES[i % len(SAMPLE_SENTENCES)] for i in range(count)]
+
+
+def write_text_pdf(path: str, pages: int, sentences_per_page: int = 25):
+    import fitz
+
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        text = " ".join(sentences(sentences_per_page))
+        page.insert_textbox(fitz.Rect(54, 54, 558, 738), f"Page {page_num + 1}. {text}", fontsize=11)
+    doc.save(path)
+    doc.close()
+
+
+def write_scanned_pdf(path: str, pages: int, sentences_per_page: int = 25, dpi: int = 150):
+    """Build a PDF whose pages are images of text, with no text layer."""
+    import fitz
+
+    source = fitz.open()
+    scanned = fitz.open()
+    zoom = dpi / 72
+    for page_num in range(pages):
+        page = source.new_page()
+        text = " ".join(sentences(sentences_per_page))
+        page.insert_textbox(fitz.Rect(54, 54, 558, 738), f"Page {page_num + 1}. {text}", fontsize=11)
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY)
+        scanned_page = scanned.new_page(width=page.rect.width, height=page.rect.height)
+        scanned_page.insert_image(scanned_page.rect, stream=pix.tobytes("png"))
+    scanned.save(path)
+    scanned.close()
+    source.close()
+
+
+def _pages_text(pages: int, sentences_per_page: int) -> list:
+    text = " ".join(sentences(sentences_per_page))
+    return [f"Page {page_num + 1}. {text}" for page_num in range(pages)]
+
+
+def write_epub(path: str, pages: int, sentences_per_page: int = 25, pages_per_chapter: int = 10):
+    """Build an EPUB with one paragraph per page, split into chapters."""
+    from ebooklib import epub
+
+    book = epub.EpubBook()
+    book.set_identifier("synthetic-book")
+    book.set_title("Synthetic Book")
+    book.set_language("en")
+    paragraphs = _pages_text(pages, sentences_per_page)
+    chapters = []
+    for start in range(0, len(paragraphs), pages_per_chapter):
+        number = len(chapters) + 1
+        chapter = epub.EpubHtml(title=f"Chapter {number}", file_name=f"chapter_{number}.xhtml", lang="en")
+        body = "".join(f"<p>{text}</p>" for text in paragraphs[start:start + pages_per_chapter])
+        chapter.content = f"<h1>Chapter {number}</h1>{body}"
+        book.add_item(chapter)
+        chapters.append(chapter)
+    book.toc = chapters
+    book.spine = chapters
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    epub.write_epub(path, book)
+
+
+def write_docx(path: str, pages: int, sentences_per_page: int = 25):
+    from docx import Document
+
+    doc = Document()
+    for text in _pages_text(pages, sentences_per_page):
+        doc.add_paragraph(text)
+    doc.save(path)
+
+
+def write_fb2(path: str, pages: int, sentences_per_page: int = 25, pages_per_section: int = 10):
+    from xml.sax.saxutils import escape
+
+    paragraphs = _pages_text(pages, sentences_per_page)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        f.write('<FictionBook xmlns="http://www.gribuser.ru/xml/fictionbook/2.0">\n')
+        f.write("<description><title-info><book-title>Synthetic Book</book-title>"
+                "<lang>en</lang></title-info></description>\n<body>\n")
+        for start in range(0, len(paragraphs), pages_per_section):
+            number = start // pages_per_section + 1
+            f.write(f"<section><title><p>Chapter {number}</p></title>\n")
+            for text in paragraphs[start:start + pages_per_section]:
+                f.write(f"<p>{escape(text)}</p>\n")
+            f.write("</section>\n")
+        f.write("</body>\n</FictionBook>\n")
@@ -0,0 +1,166 @@
+"""Measure status-poll latency while large files are being uploaded.
+
+Run from the backend directory:
+
+    python -m benchmarks.upload_latency --uploads 4 --megabytes 100
+
+Starts the API with uvicorn against a throwaway SQLite database and upload
+directory, with an in-memory Celery broker so nothing gets converted. A
+client polls /api/conversion/status every --interval seconds, first on an
+idle server and then while --uploads uploads run concurrently. The report
+gives poll latency percentiles for both phases; a blocked event loop shows
+up as a p99 in the order of the upload time.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+import aiohttp
+
+BLOCK = 1024 * 1024
+
+
+def configure_environment(workdir: str):
+    """Point the app at scratch storage. Must run before the app is imported."""
+    os.environ.update(
+        DATABASE_URL=f"sqlite:///{workdir}/bench.sqlite",
+        REDIS_URL="redis://localhost:6379/0",
+        CELERY_BROKER_URL="memory://",
+        CELERY_RESULT_BACKEND="cache+memory://",
+        UPLOAD_DIR=os.path.join(workdir, "uploads"),
+        OUTPUT_DIR=os.path.join(workdir, "outputs"),
+        VOICE_CATALOGUE_PATH=os.path.join(workdir, "voices.json"),
+        TTS_BACKEND="fake",
+        PREVIEW_PREWARM="false",
+    )
+
+
+def make_upload(workdir: str, index: int, megabytes: int) -> str:
+    """A PDF-named file of distinct bytes, so every upload is hashed and stored."""
+    path = os.path.join(workdir, f"upload_{index}.pdf")
+    block = os.urandom(BLOCK)
+    with open(path, "wb") as f:
+        f.write(f"%PDF-1.4 upload {index}\n".encode())
+        for _ in range(megabytes):
+            f.write(block)
+    return path
+
+
+def percentiles(samples: list) -> dict:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1)
+
+    return {
+        "polls": len(ordered),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1] * 1000, 1),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 1),
+    }
+
+
+async def poll(session: aiohttp.ClientSession, url: str, interval: float, done: asyncio.Event) -> list:
+    latencies = []
+    while not done.is_set():
+        started = time.perf_counter()
+        async with session.get(url) as response:
+            await response.read()
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def upload(session: aiohttp.ClientSession, base_url: str, path: str) -> float:
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        form = aiohttp.FormData()
+        form.add_field("file", f, filename=os.path.basename(path), content_type="application/pdf")
+        async with session.post(f"{base_url}/api/conversion/upload", data=form) as response:
+            response.raise_for_status()
+            await response.read()
+    return time.perf_counter() - started
+
+
+async def run(base_url: str, paths: list, interval: float, idle_seconds: float) -> dict:
+    timeout = aiohttp.ClientTimeout(total=None)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        # A conversion to poll, from a small upload
+        small = os.path.join(os.path.dirname(paths[0]), "small.pdf")
+        with open(small, "wb") as f:
+            f.write(b"%PDF-1.4 small\n")
+        with open(small, "rb") as f:
+            form = aiohttp.FormData()
+            form.add_field("file", f, filename="small.pdf", content_type="application/pdf")
+            async with session.post(f"{base_url}/api/conversion/upload", data=form) as response:
+                conversion_id = (await response.json())["id"]
+        status_url = f"{base_url}/api/conversion/status/{conversion_id}"
+
+        done = asyncio.Event()
+        poller = asyncio.create_task(poll(session, status_url, interval, done))
+        await asyncio.sleep(idle_seconds)
+        done.set()
+        idle = await poller
+
+        done = asyncio.Event()
+        poller = asyncio.create_task(poll(session, status_url, interval, done))
+        started = time.perf_counter()
+        upload_seconds = await asyncio.gather(*(upload(session, base_url, path) for path in paths))
+        elapsed = time.perf_counter() - started
+        done.set()
+        busy = await poller
+
+    return {
+        "idle": percentiles(idle),
+        "during_uploads": percentiles(busy),
+        "upload_seconds": [round(s, 2) for s in upload_seconds],
+        "wall_seconds": round(elapsed, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=4)
+    parser.add_argument("--megabytes", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=0.02)
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_upload_") as workdir:
+        configure_environment(workdir)
+        os.environ["MAX_FILE_SIZE"] = str((args.megabytes + 1) * BLOCK)
+
+        # Imported only now so the settings pick up the scratch environment
+        import uvicorn
+        from main import app
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+
+        try:
+            paths = [make_upload(workdir, idx, args.megabytes) for idx in range(args.uploads)]
+            report = asyncio.run(run(f"http://127.0.0.1:{port}", paths, args.interval, args.idle_seconds))
+        finally:
+            server.should_exit = True
+            thread.join()
+
+        report.update(uploads=args.uploads, megabytes=args.megabytes)
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
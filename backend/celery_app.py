@@ -1,5 +1,7 @@
 from celery import Celery
+from celery.signals import worker_process_shutdown, worker_ready
 from config import get_settings
+import metrics
 
 settings = get_settings()
 
@@ -9,6 +11,10 @@ celery_app = Celery(
     backend=settings.celery_result_backend
 )
 
+# The standard lane; conversions are sent to their own lane's queue (see
+# tasks.scheduling). Workers should consume all of them, e.g.
+# -Q conversions.short,conversions,conversions.long, which they do short
+# lane first and round-robin otherwise (broker_transport_options).
 celery_app.conf.task_routes = {
     "tasks.conversion_tasks.*": {"queue": "conversions"}
 }
@@ -19,7 +25,23 @@ celery_app.conf.update(
     result_serializer='json',
     timezone='UTC',
     enable_utc=True,
+    # A worker busy with a book must not hold further jobs back from idle ones
+    worker_prefetch_multiplier=1,
+    # Redis transport: a worker freed by a preempted job picks the short
+    # lane over the others
+    broker_transport_options={"queue_order_strategy": "tasks.scheduling:ShortFirstCycle"},
 )
 
+@worker_ready.connect
+def start_metrics_exporter(**kwargs):
+    if settings.metrics_worker_port:
+        metrics.start_exporter(settings.metrics_worker_port)
+
+
+@worker_process_shutdown.connect
+def forget_worker_process(pid=None, **kwargs):
+    metrics.mark_process_dead(pid)
+
+
 # Import tasks to register them
 import tasks.conversion_tasks
\ No newline at end of file
@@ -7,9 +7,83 @@ class Settings(BaseSettings):
     upload_dir: str = "../data/uploads"
     output_dir: str = "../data/outputs"
     voices_dir: str = "../data/voices"
+    checkpoint_dir: str = "../data/checkpoints"
     max_file_size: int = 524288000
     celery_broker_url: str
     celery_result_backend: str
+    # Speech engine: "edge" (online), "piper" or "espeak" (local, need ffmpeg)
+    # or "fake" (silence, for load testing)
+    tts_backend: str = "edge"
+    tts_concurrency: int = 4
+    piper_binary: str = "piper"
+    piper_models_dir: str = "../data/voices/piper"
+    piper_default_voice: str = ""
+    espeak_binary: str = "espeak-ng"
+    ffmpeg_binary: str = "ffmpeg"
+    # Voice list of the backend: refresh interval (seconds) and disk snapshot
+    voice_catalogue_ttl: int = 3600
+    voice_catalogue_path: str = "../data/cache/voices.json"
+    # Voice preview clips; pre-warming synthesizes every catalogue voice at startup
+    preview_cache_dir: str = "../data/cache/previews"
+    preview_cache_max_bytes: int = 268435456
+    preview_prewarm: bool = True
+    preview_prewarm_concurrency: int = 2
+    # Simulated request latency of the fake engine
+    fake_tts_latency: float = 0.0
+    fake_tts_seconds_per_char: float = 0.0
+    chunk_max_chars: int = 500
+    # Tune chunk_max_chars per voice from measured TTS throughput, within bounds
+    adaptive_chunking: bool = False
+    adaptive_chunk_min_chars: int = 200
+    adaptive_chunk_max_chars: int = 2000
+    # Avoid chunk sizes whose requests average longer than this; 0 disables
+    adaptive_chunk_max_latency: float = 30.0
+    tts_stats_path: str = "../data/tts_stats.json"
+    # Attempts per chunk, with jittered exponential backoff between them
+    tts_retry_attempts: int = 5
+    tts_retry_base_delay: float = 1.0
+    tts_retry_max_delay: float = 60.0
+    # Pause all synthesis on rate limiting or after this many failures in a row;
+    # trips are shared through Redis, so every worker process pauses
+    tts_breaker_threshold: int = 5
+    tts_breaker_cooldown: float = 30.0
+    tts_breaker_max_cooldown: float = 300.0
+    # Give up on a conversion once this many chunks failed every attempt
+    tts_max_failed_chunks: int = 20
+    # Parallel OCR pages for scanned PDFs; 0 means one per CPU core
+    ocr_workers: int = 0
+    ocr_cache_dir: str = "../data/cache/ocr"
+    ocr_cache_max_bytes: int = 268435456
+    tts_cache_dir: str = "../data/cache/tts"
+    tts_cache_max_bytes: int = 2147483648
+    plan_cache_dir: str = "../data/cache/plans"
+    plan_cache_max_bytes: int = 536870912
+    # Progress events go out on this Redis channel after every chunk; the
+    # database row is only written this often (seconds)
+    progress_channel: str = "conversion-progress"
+    progress_commit_interval: float = 5.0
+    # Celery workers serve Prometheus metrics on this port; 0 disables
+    metrics_worker_port: int = 9808
+    # Split large books across workers; needs checkpoint_dir on shared storage
+    pipeline_enabled: bool = False
+    pipeline_min_chunks: int = 400
+    pipeline_range_size: int = 100
+    # Finished audiobooks: "mp3" keeps the merged MP3; "m4b-aac", "m4b-opus"
+    # and "opus" re-encode it with ffmpeg and add chapter markers.
+    # output_bitrate overrides the profile's default, e.g. "48k"
+    output_profile: str = "mp3"
+    output_bitrate: str = ""
+    # Priority lanes by estimated characters: short up to the first bound,
+    # long from the second, standard in between
+    schedule_short_max_chars: int = 20000
+    schedule_long_min_chars: int = 500000
+    # Seconds a job synthesizes before it yields to shorter queued jobs;
+    # 0 disables. Extraction streams into synthesis, so a job preempted
+    # before its book was fully extracted extracts it again from the start
+    # when it resumes, only skipping the chunks it already synthesized
+    schedule_time_slice: float = 120.0
+    # Conversions each submitter may have queued per lane; 0 means no limit
+    schedule_max_queued_per_submitter: int = 2
     
     class Config:
         env_file = ".env"
@@ -1,11 +1,31 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Iterator, Optional
 
 class BaseExtractor(ABC):
     @abstractmethod
     def extract(self, file_path: str) -> str:
         pass
+
+    def iter_extract(self, file_path: str, stats: Optional[dict] = None) -> Iterator[str]:
+        """Yield the document's text in pieces (pages, chapters, paragraphs).
+
+        Concatenating the pieces gives the same text as extract(). Formats
+        that cannot be read incrementally fall back to a single piece.
+        Extractors that gather statistics (e.g. pages OCRed) add them to
+        `stats` when it is given, and those that know the book's chapters
+        note each one with add_chapter() before yielding its first piece.
+        Those that know up front how many pieces they will yield at most set
+        stats["pieces"] before the first, so progress can be reported.
+        """
+        yield self.extract(file_path)
     
     @abstractmethod
     def supports_format(self, file_extension: str) -> bool:
-        pass
\ No newline at end of file
+        pass
+
+
+def add_chapter(stats: Optional[dict], title: str, piece: int):
+    """Record in stats["chapters"] that a chapter starts at the piece-th
+    piece yielded, counting from 0."""
+    if stats is not None:
+        stats.setdefault("chapters", []).append({"title": " ".join(title.split()), "piece": piece})
@@ -1,15 +1,23 @@
 from docx import Document
-from extractors.base import BaseExtractor
+from typing import Iterator, Optional
+from extractors.base import BaseExtractor, add_chapter
 
 class DOCXExtractor(BaseExtractor):
+    # Paragraph styles that start a chapter
+    CHAPTER_STYLES = {'Heading 1'}
+
     def extract(self, file_path: str) -> str:
+        return "".join(self.iter_extract(file_path))
+
+    def iter_extract(self, file_path: str, stats: Optional[dict] = None) -> Iterator[str]:
         doc = Document(file_path)
-        text = ""
-        
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        
-        return text
+        if stats is not None:
+            stats["pieces"] = len(doc.paragraphs)
+
+        for piece, paragraph in enumerate(doc.paragraphs):
+            if paragraph.style is not None and paragraph.style.name in self.CHAPTER_STYLES and paragraph.text.strip():
+                add_chapter(stats, paragraph.text, piece)
+            yield paragraph.text + "\n"
     
     def supports_format(self, file_extension: str) -> bool:
-        return file_extension.lower() in ['.docx', '.doc']
\ No newline at end of file
+        return file_extension.lower() in ['.docx', '.doc']
@@ -1,19 +1,42 @@
 import ebooklib
 from ebooklib import epub
 from bs4 import BeautifulSoup
-from extractors.base import BaseExtractor
+from typing import Dict, Iterator, Optional
+from extractors.base import BaseExtractor, add_chapter
 
 class EPUBExtractor(BaseExtractor):
     def extract(self, file_path: str) -> str:
+        return "".join(self.iter_extract(file_path))
+
+    def iter_extract(self, file_path: str, stats: Optional[dict] = None) -> Iterator[str]:
         book = epub.read_epub(file_path)
-        text = ""
-        
-        for item in book.get_items():
-            if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                soup = BeautifulSoup(item.get_content(), 'html.parser')
-                text += soup.get_text() + "\n"
-        
-        return text
+        titles = self._toc_titles(book.toc)
+        # One piece per spine document, which is usually a chapter
+        documents = [item for item in book.get_items() if item.get_type() == ebooklib.ITEM_DOCUMENT]
+        if stats is not None:
+            stats["pieces"] = len(documents)
+
+        for pieces, item in enumerate(documents):
+            if item.file_name in titles:
+                add_chapter(stats, titles[item.file_name], pieces)
+            soup = BeautifulSoup(item.get_content(), 'html.parser')
+            yield soup.get_text() + "\n"
+
+    def _toc_titles(self, toc, titles: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Map each document the table of contents points into to its first entry's title."""
+        if titles is None:
+            titles = {}
+        for entry in toc:
+            # Nested sections come as (section, children)
+            if isinstance(entry, tuple):
+                entry, children = entry
+            else:
+                children = []
+            href = (getattr(entry, "href", None) or "").split("#")[0]
+            if href and entry.title and href not in titles:
+                titles[href] = entry.title
+            self._toc_titles(children, titles)
+        return titles
     
     def supports_format(self, file_extension: str) -> bool:
-        return file_extension.lower() == '.epub'
\ No newline at end of file
+        return file_extension.lower() == '.epub'
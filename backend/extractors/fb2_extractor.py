@@ -1,15 +1,71 @@
-from bs4 import BeautifulSoup
-from extractors.base import BaseExtractor
+from lxml import etree
+from typing import Iterator, Optional
+from extractors.base import BaseExtractor, add_chapter
 
 class FB2Extractor(BaseExtractor):
+    # Block-level elements that hold the readable text of an FB2 body
+    PARAGRAPH_TAGS = {'p', 'v', 'subtitle', 'text-author', 'td', 'th'}
+
     def extract(self, file_path: str) -> str:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f, 'xml')
-        
-        body = soup.find('body')
-        if body:
-            return body.get_text()
-        return ""
+        return "".join(self.iter_extract(file_path))
+
+    def iter_extract(self, file_path: str, stats: Optional[dict] = None) -> Iterator[str]:
+        # Parse incrementally so large books (and their embedded base64
+        # images) never sit in memory as one tree
+        context = etree.iterparse(
+            file_path, events=('start', 'end'), recover=True, huge_tree=True
+        )
+        in_body = False
+        pieces = 0
+        # Sections with a title become chapters; the title's paragraphs are
+        # the first pieces of the section
+        titles_open = 0
+        section_started = False
+        # Whether the open title is the latest chapter's
+        chapter_title = False
+
+        for event, element in context:
+            tag = etree.QName(element).localname
+
+            if tag == 'body':
+                if event == 'start':
+                    in_body = True
+                    continue
+                # Only the first body is the book; later ones hold footnotes
+                break
+
+            if not in_body:
+                continue
+            if tag == 'section' and event == 'start':
+                section_started = True
+                continue
+            if tag == 'title':
+                titles_open += 1 if event == 'start' else -1
+                chapter_title = chapter_title and titles_open > 0
+                continue
+
+            if event != 'end' or tag not in self.PARAGRAPH_TAGS:
+                continue
+
+            text = "".join(element.itertext())
+            if titles_open and section_started:
+                add_chapter(stats, text, pieces)
+                chapter_title = stats is not None
+            elif chapter_title:
+                # Further lines of the same title
+                chapter = stats["chapters"][-1]
+                chapter["title"] = " ".join(f"{chapter['title']} {text}".split())
+            section_started = False
+            yield text + "\n"
+            pieces += 1
+
+            # Free the paragraph and everything parsed before it
+            element.clear()
+            parent = element.getparent()
+            while element.getprevious() is not None:
+                del parent[0]
+
+        del context
     
     def supports_format(self, file_extension: str) -> bool:
-        return file_extension.lower() == '.fb2'
\ No newline at end of file
+        return file_extension.lower() == '.fb2'
@@ -1,5 +1,6 @@
 from extractors.base import BaseExtractor
-from extractors.ocr import get_ocr_processor
+from extractors.ocr import OCRCache, get_ocr_cache, get_ocr_processor
+from storage.hashing import file_sha256
 
 class ImageExtractor(BaseExtractor):
     """Extract text from image files using OCR."""
@@ -7,8 +8,17 @@ class ImageExtractor(BaseExtractor):
     SUPPORTED_FORMATS = ['.png', '.jpg', '.jpeg', '.tiff', '.tif', '.bmp', '.webp']
 
     def extract(self, file_path: str) -> str:
+        cache = get_ocr_cache()
+        key = OCRCache.make_key(file_sha256(file_path)) if cache else None
+        if cache:
+            text = cache.get_text(key)
+            if text is not None:
+                return text
+
         ocr = get_ocr_processor()
         text = ocr.extract_from_file(file_path)
+        if cache:
+            cache.put_text(key, text)
         return text
 
     def supports_format(self, file_extension: str) -> bool:
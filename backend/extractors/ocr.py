@@ -1,9 +1,14 @@
 import pytesseract
 from PIL import Image
 from typing import Optional
+import hashlib
 import io
+import json
 import os
 import platform
+import subprocess
+from config import get_settings
+from storage.disk_cache import DiskLRUCache
 
 class OCRProcessor:
     """OCR processor using Tesseract for extracting text from images."""
@@ -21,18 +26,40 @@ class OCRProcessor:
                     pytesseract.pytesseract.tesseract_cmd = path
                     break
 
-    def extract_from_image(self, image: Image.Image, lang: str = 'eng') -> str:
-        """Extract text from a PIL Image using OCR."""
+    def extract_from_image(self, image: Image.Image, lang: str = 'eng', threads: Optional[int] = None) -> str:
+        """Extract text from a PIL Image using OCR.
+
+        threads caps the OpenMP threads of this Tesseract run only.
+        """
         try:
             # Convert to RGB if necessary (handles RGBA, P mode, etc.)
             if image.mode not in ('RGB', 'L'):
                 image = image.convert('RGB')
 
-            text = pytesseract.image_to_string(image, lang=lang)
+            if threads:
+                text = self._run_tesseract(image, lang, {"OMP_THREAD_LIMIT": str(threads)})
+            else:
+                text = pytesseract.image_to_string(image, lang=lang)
             return text.strip()
         except Exception as e:
             raise RuntimeError(f"OCR failed: {str(e)}")
 
+    @staticmethod
+    def _run_tesseract(image: Image.Image, lang: str, env: dict) -> str:
+        """Run Tesseract with extra environment variables, which pytesseract
+        cannot pass: it always uses this process's environment."""
+        png = io.BytesIO()
+        image.save(png, format="PNG")
+        result = subprocess.run(
+            [pytesseract.pytesseract.tesseract_cmd, "stdin", "stdout", "-l", lang],
+            input=png.getvalue(),
+            capture_output=True,
+            env={**os.environ, **env}
+        )
+        if result.returncode:
+            raise RuntimeError(result.stderr.decode("utf-8", errors="replace").strip())
+        return result.stdout.decode("utf-8")
+
     def extract_from_bytes(self, image_bytes: bytes, lang: str = 'eng') -> str:
         """Extract text from image bytes using OCR."""
         image = Image.open(io.BytesIO(image_bytes))
@@ -63,3 +90,47 @@ def get_ocr_processor() -> OCRProcessor:
     if _ocr_processor is None:
         _ocr_processor = OCRProcessor()
     return _ocr_processor
+
+
+class OCRCache(DiskLRUCache):
+    """OCR text keyed by source file hash, page, render parameters and language.
+
+    Shared by the PDF and image extractors so re-converting scanned material,
+    e.g. with another voice, never runs Tesseract again.
+    """
+
+    SUFFIX = ".txt"
+    # Bump when OCR preprocessing changes so stale text is not reused
+    VERSION = 1
+
+    @classmethod
+    def make_key(cls, file_hash: str, page: int = 0, lang: str = 'eng', **render_params) -> str:
+        payload = json.dumps({
+            "version": cls.VERSION,
+            "file": file_hash,
+            "page": page,
+            "lang": lang,
+            "render": render_params,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_text(self, key: str) -> Optional[str]:
+        data = self.get_bytes(key)
+        return data.decode("utf-8") if data is not None else None
+
+    def put_text(self, key: str, text: str):
+        self.put_bytes(key, text.encode("utf-8"))
+
+
+_ocr_cache: Optional[OCRCache] = None
+
+
+def get_ocr_cache() -> Optional[OCRCache]:
+    """Get the shared OCR cache, or None when caching is disabled."""
+    global _ocr_cache
+    settings = get_settings()
+    if settings.ocr_cache_max_bytes <= 0:
+        return None
+    if _ocr_cache is None:
+        _ocr_cache = OCRCache(settings.ocr_cache_dir, settings.ocr_cache_max_bytes)
+    return _ocr_cache
@@ -1,54 +1,151 @@
 import fitz
 from PIL import Image
-import io
-from extractors.base import BaseExtractor
-from extractors.ocr import get_ocr_processor
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, Optional
+from extractors.base import BaseExtractor, add_chapter
+from extractors.ocr import OCRCache, get_ocr_cache, get_ocr_processor
+from storage.hashing import file_sha256
+from config import get_settings
 
 class PDFExtractor(BaseExtractor):
     # Minimum characters per page to consider text extraction successful
     MIN_CHARS_PER_PAGE = 50
+    # Render resolution for OCR
+    OCR_DPI = 300
+
+    def __init__(self, ocr_workers: Optional[int] = None):
+        # 0 or unset means one OCR worker per CPU core
+        self.ocr_workers = ocr_workers or get_settings().ocr_workers or os.cpu_count() or 1
 
     def extract(self, file_path: str) -> str:
-        doc = fitz.open(file_path)
-        text = ""
+        return "".join(self.iter_extract(file_path))
 
-        # First, try regular text extraction
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text += page.get_text()
+    def iter_extract(self, file_path: str, stats: Optional[dict] = None) -> Iterator[str]:
+        """Yield text page by page, OCRing only pages without a usable text layer.
 
-        # Check if we got meaningful text
-        avg_chars_per_page = len(text.strip()) / max(len(doc), 1)
+        A page whose text layer has fewer than MIN_CHARS_PER_PAGE characters
+        is treated as scanned. Per-page counts are collected into `stats`.
+        """
+        doc = fitz.open(file_path)
+        cache = get_ocr_cache()
+        file_hash = file_sha256(file_path) if cache else None
+        if stats is None:
+            stats = {}
+        stats.update({
+            "pages": len(doc),
+            "text_pages": 0,
+            "ocr_pages": 0,
+            "ocr_page_numbers": [],
+            "text_chars": 0,
+            "ocr_chars": 0,
+            "ocr_cache_hits": 0,
+        })
 
-        if avg_chars_per_page < self.MIN_CHARS_PER_PAGE:
-            # Text extraction failed or minimal - try OCR
-            text = self._extract_with_ocr(doc)
+        try:
+            yield from self._iter_pages(doc, stats, cache, file_hash)
+        finally:
+            doc.close()
 
-        doc.close()
-        return text
+    def _iter_pages(
+        self,
+        doc: fitz.Document,
+        stats: dict,
+        cache: Optional[OCRCache] = None,
+        file_hash: Optional[str] = None
+    ) -> Iterator[str]:
+        """Yield page texts in order, OCRing scanned pages in parallel.
 
-    def _extract_with_ocr(self, doc: fitz.Document) -> str:
-        """Extract text from PDF using OCR on rendered pages."""
+        Pages are read and rendered here, one at a time, because a fitz
+        document must not be shared between threads. Each pool thread then
+        drives its own Tesseract process, so OCR uses every core even though
+        the threads share one interpreter.
+        """
         ocr = get_ocr_processor()
-        text_parts = []
+        # Outline entries become chapters at the first text on or after their page
+        outline = deque(sorted(
+            (page, position, title) for position, (_, title, page) in enumerate(doc.get_toc()) if page >= 1
+        ))
+        pieces = 0
+
+        # Parallel pages already use every core; stop each Tesseract from
+        # also starting one OpenMP thread per core
+        ocr_threads = 1 if self.ocr_workers > 1 else None
+
+        def cache_key(page_num: int) -> str:
+            return OCRCache.make_key(file_hash, page_num, dpi=self.OCR_DPI, colorspace="gray")
+
+        def ready(entry) -> bool:
+            return not isinstance(entry[2], Future) or entry[2].done()
+
+        def mark_chapters(page_num: int):
+            nonlocal pieces
+            while outline and outline[0][0] <= page_num + 1:
+                add_chapter(stats, outline.popleft()[2], pieces)
+            pieces += 1
+
+        def finish(entry) -> Optional[str]:
+            """The page's text, or None if it has none; counts it as the next piece."""
+            page_num, layer_text, ocr_result = entry
+            if ocr_result is None:
+                mark_chapters(page_num)
+                return layer_text
+            if isinstance(ocr_result, Future):
+                ocr_text = ocr_result.result()
+                if cache:
+                    cache.put_text(cache_key(page_num), ocr_text)
+            else:
+                ocr_text = ocr_result
+            page_text = ocr_text or layer_text.strip()
+            stats["ocr_chars"] += len(page_text)
+            if not page_text:
+                return None
+            mark_chapters(page_num)
+            return page_text + "\n\n"
+
+        with ThreadPoolExecutor(max_workers=self.ocr_workers) as pool:
+            # (page number, text layer, OCR result): the result is None for
+            # text pages, cached OCR text, or a Future for pages being OCRed
+            in_flight = deque()
 
-        for page_num in range(len(doc)):
-            page = doc[page_num]
+            for page_num in range(len(doc)):
+                page = doc[page_num]
+                layer_text = page.get_text()
 
-            # Render page to image at 300 DPI for good OCR quality
-            mat = fitz.Matrix(300 / 72, 300 / 72)  # 300 DPI
-            pix = page.get_pixmap(matrix=mat)
+                if len(layer_text.strip()) >= self.MIN_CHARS_PER_PAGE:
+                    stats["text_pages"] += 1
+                    stats["text_chars"] += len(layer_text)
+                    in_flight.append((page_num, layer_text, None))
+                else:
+                    stats["ocr_pages"] += 1
+                    stats["ocr_page_numbers"].append(page_num + 1)
+                    ocr_result = cache.get_text(cache_key(page_num)) if cache else None
+                    if ocr_result is not None:
+                        stats["ocr_cache_hits"] += 1
+                    else:
+                        ocr_result = pool.submit(
+                            ocr.extract_from_image, self._render_page(page), threads=ocr_threads
+                        )
+                    in_flight.append((page_num, layer_text, ocr_result))
 
-            # Convert to PIL Image
-            img_data = pix.tobytes("png")
-            image = Image.open(io.BytesIO(img_data))
+                # Keep only a few rendered pages in memory at once
+                while in_flight and (len(in_flight) > self.ocr_workers or ready(in_flight[0])):
+                    page_text = finish(in_flight.popleft())
+                    if page_text:
+                        yield page_text
 
-            # Extract text with OCR
-            page_text = ocr.extract_from_image(image)
-            if page_text:
-                text_parts.append(page_text)
+            while in_flight:
+                page_text = finish(in_flight.popleft())
+                if page_text:
+                    yield page_text
 
-        return "\n\n".join(text_parts)
+    def _render_page(self, page: fitz.Page) -> Image.Image:
+        """Render a page straight into a grayscale PIL image for OCR."""
+        zoom = self.OCR_DPI / 72
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+        # Wrap the raw samples directly instead of a PNG encode/decode round trip
+        return Image.frombytes("L", (pix.width, pix.height), pix.samples, "raw", "L", pix.stride)
 
     def supports_format(self, file_extension: str) -> bool:
         return file_extension.lower() == '.pdf'
@@ -4,12 +4,20 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, Response
 from api.routes import conversion, voices
 from models.database import engine, Base
+from tts.voice_catalogue import get_voice_catalogue
+from tts.preview_store import prewarm_previews
+from metrics import render_metrics
 from config import get_settings
+import asyncio
+import mimetypes
 import os
 from pathlib import Path
 
 settings = get_settings()
 
+# Audiobook outputs; Python does not know the M4B extension
+mimetypes.add_type("audio/mp4", ".m4b")
+
 Base.metadata.create_all(bind=engine)
 
 app = FastAPI(title="Voynich API")
@@ -25,6 +33,19 @@ app.add_middleware(
 app.include_router(conversion.router, prefix="/api/conversion", tags=["conversion"])
 app.include_router(voices.router, prefix="/api/voices", tags=["voices"])
 
+@app.on_event("startup")
+async def start_voice_catalogue():
+    # Load the voice list once and keep it fresh in the background
+    get_voice_catalogue().start()
+    if settings.preview_prewarm:
+        # Runs in the background so startup is not held up by synthesis
+        app.state.preview_prewarm = asyncio.get_running_loop().create_task(prewarm_previews())
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 os.makedirs(settings.output_dir, exist_ok=True)
 app.mount("/outputs", StaticFiles(directory=settings.output_dir), name="outputs")
 
@@ -0,0 +1,137 @@
+"""Prometheus metrics of the conversion pipeline.
+
+The API serves them at /metrics and every Celery worker on
+METRICS_WORKER_PORT. Prefork worker children each count separately; set
+PROMETHEUS_MULTIPROC_DIR to an empty directory shared by the worker (and,
+on the same host, the API) so the exporter reports all of them together.
+"""
+import os
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+    generate_latest, multiprocess, start_http_server
+)
+
+STAGE_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200, float("inf"))
+
+STAGE_SECONDS = Histogram(
+    "voynich_stage_seconds",
+    "Time spent per conversion stage (extraction, chunking, synthesis, range_synthesis, merge, encoding, total), by input format",
+    ["stage", "format"],
+    buckets=STAGE_BUCKETS
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "voynich_queue_wait_seconds",
+    "Time from upload until a worker first picked the conversion up",
+    buckets=(1, 5, 15, 30, 60, 300, 900, 1800, 3600, 7200, 21600, float("inf"))
+)
+TTS_REQUEST_SECONDS = Histogram(
+    "voynich_tts_request_seconds",
+    "Latency of single chunk requests to the TTS backend",
+    ["backend", "voice", "outcome"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120, float("inf"))
+)
+TTS_RETRIES = Counter("voynich_tts_retries", "Chunk requests retried after an error", ["backend"])
+BREAKER_OPENS = Counter("voynich_tts_breaker_opens", "Times the TTS circuit breaker opened")
+PAGES = Counter("voynich_pages", "Document pages extracted, by whether OCR was needed", ["format", "source"])
+CACHE_LOOKUPS = Counter("voynich_cache_lookups", "Disk cache lookups", ["cache", "result"])
+CACHE_EVICTIONS = Counter("voynich_cache_evictions", "Disk cache entries evicted", ["cache"])
+OUTPUT_BYTES = Counter("voynich_output_bytes", "Size of finished audiobooks, by input format", ["format"])
+CONVERSIONS = Counter("voynich_conversions", "Conversion tasks finished, by outcome", ["status"])
+PREEMPTIONS = Counter("voynich_preemptions", "Conversions that yielded their worker to shorter jobs", ["lane"])
+
+
+class TimedIterator:
+    """Wraps an iterator, adding up the time spent producing its items."""
+
+    def __init__(self, iterable: Iterable):
+        self._iterator = iter(iterable)
+        self.seconds = 0.0
+
+    def __iter__(self) -> Iterator:
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            return next(self._iterator)
+        finally:
+            self.seconds += time.perf_counter() - started
+
+
+class Stopwatch:
+    """Adds up time across separate `with` blocks."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._started = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds += time.perf_counter() - self._started
+
+
+def _format_label(file_format: str) -> str:
+    return file_format.lower().lstrip(".")
+
+
+def observe_stage(stage: str, file_format: str, seconds: float):
+    STAGE_SECONDS.labels(stage, _format_label(file_format)).observe(seconds)
+
+
+def observe_output(file_format: str, size: int):
+    OUTPUT_BYTES.labels(_format_label(file_format)).inc(size)
+
+
+def observe_extraction(file_format: str, extraction_seconds: float, chunking_seconds: float, stats: dict):
+    observe_stage("extraction", file_format, extraction_seconds)
+    observe_stage("chunking", file_format, chunking_seconds)
+    for source in ("text", "ocr"):
+        if stats.get(f"{source}_pages"):
+            PAGES.labels(_format_label(file_format), source).inc(stats[f"{source}_pages"])
+
+
+def _seconds_since(moment: datetime) -> float:
+    if moment.tzinfo is None:
+        # Naive timestamps are UTC, e.g. from utcnow() or SQLite
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0.0, (datetime.now(timezone.utc) - moment).total_seconds())
+
+
+def observe_queue_wait(created_at: Optional[datetime]):
+    if created_at is not None:
+        QUEUE_WAIT_SECONDS.observe(_seconds_since(created_at))
+
+
+def observe_total(file_format: str, started_at: Optional[datetime]):
+    """Time since a conversion started, for one that ran across several tasks."""
+    if started_at is not None:
+        observe_stage("total", file_format, _seconds_since(started_at))
+
+
+def _registry() -> CollectorRegistry:
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """The current metrics in the Prometheus text format, with its content type."""
+    return generate_latest(_registry()), CONTENT_TYPE_LATEST
+
+
+def start_exporter(port: int):
+    """Serve the metrics over HTTP from a background thread."""
+    start_http_server(port, registry=_registry())
+
+
+def mark_process_dead(pid: int):
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, Float, Text
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Float, Text, JSON, Index
 from sqlalchemy.sql import func
 import enum
 from models.database import Base
@@ -15,6 +15,8 @@ class Conversion(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, nullable=False)
+    # sha256 of the uploaded bytes
+    content_hash = Column(String(64), nullable=True, index=True)
     file_format = Column(String, nullable=False)
     status = Column(Enum(ConversionStatus), default=ConversionStatus.PENDING)
     voice_id = Column(String, nullable=True)
@@ -27,6 +29,23 @@ class Conversion(Base):
     task_id = Column(String, nullable=True)
     chunks_total = Column(Integer, nullable=True)
     chunks_completed = Column(Integer, default=0)
+    # Extractor statistics, e.g. text-layer vs OCR page counts for PDFs
+    extraction_stats = Column(JSON, nullable=True)
+    # Chunks that failed every retry in the last run, as {"index", "error"}
+    failed_chunks = Column(JSON, nullable=True)
+    # Who uploaded it, for fair sharing of the workers
+    submitter = Column(String, nullable=True)
+    # Priority lane picked from the estimated text length at upload
+    lane = Column(String, nullable=True)
+    estimated_chars = Column(Integer, nullable=True)
+
+    # The conversion list filters on status and pages newest first by
+    # (created_at, id); the scheduler counts queued conversions per submitter
+    __table_args__ = (
+        Index("ix_conversions_status_created_at", "status", "created_at", "id"),
+        Index("ix_conversions_created_at", "created_at", "id"),
+        Index("ix_conversions_submitter_status", "submitter", "status", "lane"),
+    )
 
 class VoiceProfile(Base):
     __tablename__ = "voice_profiles"
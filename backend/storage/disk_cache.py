@@ -0,0 +1,143 @@
+import os
+import shutil
+import time
+from collections import OrderedDict
+from typing import Optional
+from metrics import CACHE_EVICTIONS, CACHE_LOOKUPS
+
+class DiskLRUCache:
+    """Size-bounded key/value store on disk with least-recently-used eviction.
+
+    Entries live at <cache_dir>/<key[:2]>/<key><SUFFIX> so every process
+    sharing the directory benefits. Recency is tracked through file mtimes,
+    which lets the index be rebuilt from disk at any time.
+    """
+
+    SUFFIX = ".bin"
+    # How often to rescan the directory for entries added by other processes
+    INDEX_REFRESH_SECONDS = 60
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._indexed_at: Optional[float] = None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}{self.SUFFIX}")
+
+    def _refresh_index(self, force: bool = False):
+        if (not force and self._indexed_at is not None
+                and time.monotonic() - self._indexed_at < self.INDEX_REFRESH_SECONDS):
+            return
+
+        entries = []
+        if os.path.isdir(self.cache_dir):
+            for shard in os.scandir(self.cache_dir):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(self.SUFFIX):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name[:-len(self.SUFFIX)], stat.st_size))
+
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._total_bytes = sum(size for _, _, size in entries)
+        self._indexed_at = time.monotonic()
+
+    def _hit(self, key: str):
+        self.hits += 1
+        CACHE_LOOKUPS.labels(type(self).__name__, "hit").inc()
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            pass
+        if key in self._index:
+            self._index.move_to_end(key)
+
+    def _miss(self, key: str):
+        self.misses += 1
+        CACHE_LOOKUPS.labels(type(self).__name__, "miss").inc()
+        self._forget(key)
+
+    def get_file(self, key: str, output_path: str) -> bool:
+        """Copy a cached entry to output_path. Returns False on a miss."""
+        try:
+            shutil.copyfile(self._path(key), output_path)
+        except FileNotFoundError:
+            self._miss(key)
+            return False
+
+        self._hit(key)
+        return True
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self._miss(key)
+            return None
+
+        self._hit(key)
+        return data
+
+    def put_file(self, key: str, source_path: str):
+        """Store a copy of source_path, evicting the least recently used entries."""
+        self._store(key, lambda tmp_path: shutil.copyfile(source_path, tmp_path))
+
+    def put_bytes(self, key: str, data: bytes):
+        def write(tmp_path: str):
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+
+        self._store(key, write)
+
+    def _store(self, key: str, write):
+        cached = self._path(key)
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+
+        # Write under a temp name so concurrent readers never see a partial file
+        tmp_path = f"{cached}.{os.getpid()}.tmp"
+        write(tmp_path)
+        os.replace(tmp_path, cached)
+
+        self._refresh_index()
+        self._forget(key)
+        size = os.path.getsize(cached)
+        self._index[key] = size
+        self._total_bytes += size
+        self._evict()
+
+    def _forget(self, key: str):
+        size = self._index.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            CACHE_EVICTIONS.labels(type(self).__name__).inc()
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._index),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,92 @@
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Tuple
+from storage.locking import file_lock
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def blob_path(upload_dir: str, content_hash: str, file_ext: str) -> str:
+    """Location of the single stored copy of an upload's bytes."""
+    return os.path.join(upload_dir, "blobs", content_hash[:2], f"{content_hash}{file_ext.lower()}")
+
+
+@contextmanager
+def blob_lock(upload_dir: str) -> Iterator[None]:
+    """Serializes publishing uploads against releasing blobs.
+
+    Hold it while checking that no conversion references a blob and
+    removing it, so an upload of the same bytes cannot slip in between.
+    """
+    with file_lock(os.path.join(upload_dir, "blobs.lock")):
+        yield
+
+
+def store_upload(
+    source: BinaryIO,
+    upload_dir: str,
+    file_ext: str,
+    max_bytes: int,
+    block_size: int = 1024 * 1024
+) -> Tuple[str, int, str]:
+    """Stream an upload into a staging file under upload_dir.
+
+    Hashing, the size limit and the write all happen in one pass over the
+    data. Returns (sha256, size, staged_path); publish_upload() turns the
+    staged file into the blob once a conversion referencing it is committed.
+    """
+    incoming_dir = os.path.join(upload_dir, "incoming")
+    os.makedirs(incoming_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=incoming_dir, suffix=file_ext.lower())
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while block := source.read(block_size):
+                size += len(block)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"File exceeds the {max_bytes} byte limit")
+                digest.update(block)
+                buffer.write(block)
+        return digest.hexdigest(), size, tmp_path
+    except BaseException:
+        discard_upload(tmp_path)
+        raise
+
+
+def publish_upload(upload_dir: str, content_hash: str, file_ext: str, staged_path: str):
+    """Move a staged upload into content-addressed storage.
+
+    Identical content is stored once: if the blob exists, the staged copy
+    is dropped and the upload references the existing blob. Call this only
+    after the referencing conversion is committed. A release that ran
+    before the commit may have removed the blob; the staged copy then
+    takes its place.
+    """
+    final_path = blob_path(upload_dir, content_hash, file_ext)
+    with blob_lock(upload_dir):
+        if os.path.exists(final_path):
+            os.remove(staged_path)
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            # Atomic, so a queued job never reads a half-written blob
+            os.replace(staged_path, final_path)
+
+
+def discard_upload(staged_path: str):
+    if os.path.exists(staged_path):
+        os.remove(staged_path)
+
+
+def remove_blob(upload_dir: str, content_hash: Optional[str], file_ext: str):
+    """Delete a blob; callers check it is unused while holding blob_lock()."""
+    if not content_hash:
+        return
+    try:
+        os.remove(blob_path(upload_dir, content_hash, file_ext))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import shutil
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+class ConversionCheckpoint:
+    """Durable per-conversion state so a re-run can skip finished chunks.
+
+    Layout of <checkpoint_dir>/<conversion_id>/:
+        plan.jsonl        the voice and chunk size, then one chunk text and
+                          hash per line; plan.jsonl.part while recorded
+        state.json        chunks appended to the output and its byte length
+        timeline.txt      start and end time of every appended chunk
+        segment_<i>.mp3   synthesized chunks not yet appended to the output
+    """
+
+    def __init__(self, checkpoint_dir: str, conversion_id: int):
+        self.path = os.path.join(checkpoint_dir, str(conversion_id))
+
+    @staticmethod
+    def hash_chunk(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _write_json(self, name: str, data: dict):
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = self._file(f"{name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._file(name))
+
+    def _read_json(self, name: str) -> Optional[dict]:
+        try:
+            with open(self._file(name), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save_plan(
+        self,
+        chunks: Iterable[str],
+        voice: Optional[str],
+        max_chars: int,
+        resume: Optional[List[str]] = None
+    ):
+        for _ in self.record_plan(chunks, voice, max_chars, resume):
+            pass
+
+    def record_plan(
+        self,
+        chunks: Iterable[str],
+        voice: Optional[str],
+        max_chars: int,
+        resume: Optional[List[str]] = None
+    ) -> Iterator[str]:
+        """Persist chunks as they are produced, passing each one through.
+
+        Any previous plan and progress is discarded right away, unless
+        resume holds the chunk hashes of an interrupted plan (see
+        load_partial_plan): then the progress made on it is kept, and the
+        chunks are checked against it as they come. If they differ, the
+        progress is discarded after all and ValueError raised. The new plan
+        only becomes loadable once the iterable is exhausted.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        if resume is None:
+            self._discard_progress()
+
+        return self._write_plan(chunks, voice, max_chars, resume or [])
+
+    def _discard_progress(self):
+        for name in os.listdir(self.path):
+            if name.startswith("segment_") or name.startswith("plan.jsonl"):
+                os.remove(self._file(name))
+        self.save_state(0, 0)
+
+    def _write_plan(
+        self,
+        chunks: Iterable[str],
+        voice: Optional[str],
+        max_chars: int,
+        resume: List[str]
+    ) -> Iterator[str]:
+        partial_path = self._file("plan.jsonl.part")
+        mismatch = None
+        with open(partial_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"voice": voice, "max_chars": max_chars}) + "\n")
+            for idx, chunk in enumerate(chunks):
+                chunk_hash = self.hash_chunk(chunk)
+                if idx < len(resume) and chunk_hash != resume[idx]:
+                    mismatch = idx
+                    break
+                f.write(json.dumps({"text": chunk, "hash": chunk_hash}, ensure_ascii=False) + "\n")
+                # A run that dies mid-plan resumes behind the chunks written
+                f.flush()
+                yield chunk
+            else:
+                os.fsync(f.fileno())
+        if mismatch is not None:
+            self._discard_progress()
+            raise ValueError(f"Chunk {mismatch} differs from the interrupted plan, so it is started over")
+        os.replace(partial_path, self._file("plan.jsonl"))
+
+    def load_partial_plan(self, voice: Optional[str]) -> Optional[Tuple[int, List[str]]]:
+        """Chunk size and chunk hashes of an interrupted plan for the same voice."""
+        try:
+            with open(self._file("plan.jsonl.part"), encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                if header.get("voice") != voice or "max_chars" not in header:
+                    return None
+
+                hashes = []
+                for line in f:
+                    try:
+                        hashes.append(json.loads(line)["hash"])
+                    except (ValueError, KeyError):
+                        # Cut short mid-line
+                        break
+                return header["max_chars"], hashes
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def load_plan(self, voice: Optional[str]) -> Optional[List[str]]:
+        """Return the saved chunk list if it is complete, intact and for the same voice."""
+        try:
+            with open(self._file("plan.jsonl"), encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                if header.get("voice") != voice:
+                    return None
+
+                chunks = []
+                for line in f:
+                    entry = json.loads(line)
+                    if entry["hash"] != self.hash_chunk(entry["text"]):
+                        return None
+                    chunks.append(entry["text"])
+                return chunks
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def save_state(self, chunks_appended: int, output_bytes: int):
+        self._write_json("state.json", {
+            "chunks_appended": chunks_appended,
+            "output_bytes": output_bytes,
+        })
+
+    def load_state(self) -> Tuple[int, int]:
+        state = self._read_json("state.json") or {}
+        return state.get("chunks_appended", 0), state.get("output_bytes", 0)
+
+    def segment_path(self, index: int) -> str:
+        return self._file(f"segment_{index}.mp3")
+
+    def timeline_path(self) -> str:
+        return self._file("timeline.txt")
+
+    def has_segment(self, index: int) -> bool:
+        return os.path.exists(self.segment_path(index))
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -1,4 +1,4 @@
-from celery import Task
+from celery import Task, chord
 from sqlalchemy.orm import Session
 from celery_app import celery_app
 from models.database import SessionLocal
@@ -6,10 +6,25 @@ from models.conversion import Conversion, ConversionStatus
 from extractors.factory import ExtractorFactory
 from tts.tts_manager import TTSManager
 from tts.chunker import TextChunker
-from audio.processor import AudioProcessor
+from tts.cache import get_chunk_cache
+from tts.chunk_sizing import ChunkSizeTuner, get_chunk_size_tuner
+from tts.resilience import ChunkSynthesisError, get_circuit_breaker, get_retry_policy
+from tts.plan_cache import PlanCache, get_plan_cache
+from storage.hashing import file_sha256
+from storage.uploads import blob_path
+from tasks.checkpoint import ConversionCheckpoint
+from tasks.progress import ProgressReporter, publish_progress
+from tasks.scheduling import PreemptionCheck, estimate_chars, lane_queue, release_waiting, requeue
+from audio.processor import AudioProcessor, ChunkAppender, get_output_profile
 from config import get_settings
+from metrics import (
+    CONVERSIONS, PREEMPTIONS, Stopwatch, TimedIterator,
+    observe_extraction, observe_output, observe_queue_wait, observe_stage, observe_total
+)
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import itertools
 import os
-import tempfile
+import time
 from datetime import datetime
 
 settings = get_settings()
@@ -17,73 +32,567 @@ settings = get_settings()
 class ConversionTask(Task):
     def on_failure(self, exc, task_id, args, kwargs, einfo):
         db = SessionLocal()
-        conversion_id = args[0]
+        # Chord callbacks receive the header results first, so they pass
+        # conversion_id as a keyword
+        conversion_id = kwargs.get("conversion_id", args[0] if args else None)
         conversion = db.query(Conversion).filter(Conversion.id == conversion_id).first()
         if conversion:
             conversion.status = ConversionStatus.FAILED
             conversion.error_message = str(exc)
+            if isinstance(exc, ChunkSynthesisError):
+                # Pipeline ranges fail independently, so collect them all
+                conversion.failed_chunks = (conversion.failed_chunks or []) + exc.failures
             db.commit()
+            publish_progress(conversion)
         db.close()
+        CONVERSIONS.labels("failed").inc()
 
-@celery_app.task(base=ConversionTask, bind=True)
+
+class ExtractionProgress:
+    """How much of the source has been extracted, while the chunk count is unknown.
+
+    Counted in pieces for extractors that report their number up front
+    (stats["pieces"], or stats["pages"] of PDFs), otherwise in characters
+    against the estimate of the upload's size. Stays below 1 until
+    extraction finishes, as the totals are upper bounds or estimates.
+    """
+
+    def __init__(self, stats: dict, estimated_chars: Optional[int]):
+        self.stats = stats
+        self.estimated_chars = estimated_chars
+        self.pieces = 0
+        self.chars = 0
+
+    def track(self, pieces: Iterable[str]) -> Iterator[str]:
+        for piece in pieces:
+            self.pieces += 1
+            self.chars += len(piece)
+            yield piece
+
+    @property
+    def fraction(self) -> float:
+        total_pieces = self.stats.get("pieces") or self.stats.get("pages")
+        if total_pieces:
+            done = self.pieces / total_pieces
+        elif self.estimated_chars:
+            done = self.chars / self.estimated_chars
+        else:
+            return 0.0
+        return min(done, 0.99)
+
+
+def _iter_source_chunks(
+    conversion: Conversion,
+    max_chars: int,
+    stats: dict,
+    progress: Optional[ExtractionProgress] = None
+) -> Iterator[str]:
+    """Extract and chunk the uploaded file lazily, piece by piece.
+
+    Extractor statistics land in `stats` once the iterator is exhausted.
+    """
+    file_ext = os.path.splitext(conversion.filename)[1]
+
+    extractor = ExtractorFactory.get_extractor(file_ext)
+    if not extractor:
+        raise ValueError(f"Unsupported format: {file_ext}")
+
+    chunker = TextChunker(max_chars=max_chars)
+    pieces = extractor.iter_extract(_source_path(conversion), stats)
+    pages = TimedIterator(progress.track(pieces) if progress else pieces)
+    chunks = TimedIterator(_chunk_chapters(chunker, pages, stats))
+    return _observe_source(chunks, pages, conversion.file_format, stats)
+
+
+def _chunk_chapters(chunker: TextChunker, pieces: Iterable[str], stats: dict) -> Iterator[str]:
+    """Chunk extracted pieces so that every chapter starts a new chunk.
+
+    The chapters the extractor noted in stats get the index of their first
+    chunk in place of their first piece.
+    """
+    started = 0
+    chunk_count = 0
+
+    def chapters_started(item) -> int:
+        nonlocal started
+        piece = item[0]
+        chapters = stats.get("chapters", [])
+        while started < len(chapters) and chapters[started]["piece"] <= piece:
+            started += 1
+        return started
+
+    numbered = 0
+    for number, group in itertools.groupby(enumerate(pieces), chapters_started):
+        for chapter in stats.get("chapters", [])[numbered:number]:
+            del chapter["piece"]
+            chapter["chunk"] = chunk_count
+        numbered = number
+        for chunk in chunker.iter_chunks(text for _, text in group):
+            chunk_count += 1
+            yield chunk
+
+
+def _observe_source(chunks: TimedIterator, pages: TimedIterator, file_format: str, stats: dict) -> Iterator[str]:
+    yield from chunks
+    # The chunker pulls the pages, so its time includes theirs
+    observe_extraction(file_format, pages.seconds, chunks.seconds - pages.seconds, stats)
+
+
+def _source_path(conversion: Conversion) -> str:
+    if conversion.content_hash:
+        path = blob_path(settings.upload_dir, conversion.content_hash, conversion.file_format)
+        if os.path.exists(path):
+            return path
+    # Uploads stored before content-addressing live under their filename
+    return os.path.join(settings.upload_dir, conversion.filename)
+
+
+def _output_stem(conversion: Conversion) -> str:
+    # The output is written in place while the job runs, so conversions of
+    # uploads with the same name must not share it
+    return f"{os.path.splitext(conversion.filename)[0]}-{conversion.id}"
+
+
+def _output_filename(conversion: Conversion) -> str:
+    return f"{_output_stem(conversion)}.mp3"
+
+
+def _chapter_marks(
+    extraction_stats: Optional[dict],
+    starts: Dict[int, float],
+    duration: float
+) -> List[Tuple[str, float, float]]:
+    """(title, start, end) in seconds of every chapter that has audio."""
+    marks = []
+    for chapter in (extraction_stats or {}).get("chapters", []):
+        start = starts.get(chapter.get("chunk"))
+        # Chapters without text of their own share a start; the first names it
+        if start is None or (marks and start <= marks[-1][1]):
+            continue
+        marks.append((chapter["title"], start))
+    ends = [start for _, start in marks[1:]] + [duration]
+    return [(title, start, end) for (title, start), end in zip(marks, ends)]
+
+
+def _finish_output(conversion: Conversion, mp3_path: str, appender: ChunkAppender) -> str:
+    """Encode the merged MP3 into the configured output profile, with the
+    chapters found during extraction as markers. Returns the output's filename."""
+    profile = get_output_profile(settings.output_profile)
+    output_filename = os.path.basename(mp3_path)
+    if profile.codec:
+        output_filename = f"{_output_stem(conversion)}{profile.extension}"
+        encode_started = time.perf_counter()
+        AudioProcessor.encode_audiobook(
+            mp3_path,
+            os.path.join(settings.output_dir, output_filename),
+            profile,
+            _chapter_marks(conversion.extraction_stats, appender.starts, appender.duration),
+            title=os.path.splitext(conversion.filename)[0],
+            bitrate=settings.output_bitrate or None,
+            ffmpeg_binary=settings.ffmpeg_binary
+        )
+        os.remove(mp3_path)
+        observe_stage("encoding", conversion.file_format, time.perf_counter() - encode_started)
+    observe_output(conversion.file_format, os.path.getsize(os.path.join(settings.output_dir, output_filename)))
+    return output_filename
+
+
+def _use_pipeline(total_chunks: int) -> bool:
+    return settings.pipeline_enabled and total_chunks >= settings.pipeline_min_chunks
+
+
+def _tts_manager(sizing: Optional[ChunkSizeTuner]) -> TTSManager:
+    return TTSManager(
+        settings.voices_dir,
+        cache=get_chunk_cache(),
+        sizing=sizing,
+        retry=get_retry_policy(),
+        breaker=get_circuit_breaker()
+    )
+
+
+def _record_chunk_failure(failures: List[dict], idx: int, part_path: str, exc: Exception):
+    """Note a chunk that failed every retry, aborting once too many have.
+
+    The other chunks keep going, so a resume only has to redo these.
+    """
+    if os.path.exists(part_path):
+        os.remove(part_path)
+    failures.append({"index": idx, "error": f"{type(exc).__name__}: {exc}"})
+    if len(failures) > settings.tts_max_failed_chunks:
+        raise ChunkSynthesisError.from_failures(failures)
+
+
+# acks_late + reject_on_worker_lost re-queue the task if the worker dies,
+# and the checkpoint lets the re-run pick up where the last one stopped
+@celery_app.task(base=ConversionTask, bind=True, acks_late=True, reject_on_worker_lost=True)
 def convert_to_audiobook(self, conversion_id: int):
     db = SessionLocal()
+    preemption_db = None
+    sizing = get_chunk_size_tuner()
 
     try:
         conversion = db.query(Conversion).filter(Conversion.id == conversion_id).first()
+        if conversion.status == ConversionStatus.CANCELLED:
+            # A terminated task may be redelivered after it was cancelled
+            return
+
+        if conversion.started_at is None:
+            # Resumed conversions would count their whole first run as waiting
+            observe_queue_wait(conversion.created_at)
+        started = time.perf_counter()
+
         conversion.status = ConversionStatus.PROCESSING
         conversion.started_at = datetime.utcnow()
         db.commit()
+        publish_progress(conversion)
+        # This one left the queue, so the submitter may queue another
+        release_waiting(db, conversion.submitter, conversion.lane)
+        # Checked while chunks are pulled, outside the thread that uses db
+        preemption_db = SessionLocal()
+        preemption = PreemptionCheck(preemption_db, conversion.lane)
 
-        file_path = os.path.join(settings.upload_dir, conversion.filename)
-        file_ext = os.path.splitext(conversion.filename)[1]
+        # voice_id is now an edge-tts voice name (e.g., "en-US-AriaNeural")
+        voice_name = conversion.voice_id if conversion.voice_id else None
 
-        extractor = ExtractorFactory.get_extractor(file_ext)
-        if not extractor:
-            raise ValueError(f"Unsupported format: {file_ext}")
+        tts_manager = _tts_manager(sizing)
+        if sizing:
+            max_chars = sizing.chunk_size(voice_name or tts_manager.default_voice)
+        else:
+            max_chars = settings.chunk_max_chars
 
-        text = extractor.extract(file_path)
+        checkpoint = ConversionCheckpoint(settings.checkpoint_dir, conversion_id)
+        chunks = checkpoint.load_plan(voice_name)
+        extraction_stats = {}
+        # Hashes of the chunks an interrupted or preempted run planned; it
+        # is continued with the chunk size it was planned with
+        resumed = None
+        if chunks is None:
+            partial = checkpoint.load_partial_plan(voice_name)
+            if partial:
+                max_chars, resumed = partial
 
-        chunker = TextChunker(max_chars=500)
-        chunks = chunker.chunk_by_sentences(text)
+        # Key of a plan that still has to be added to the plan cache
+        plan_key = None
+        plan_cache = get_plan_cache()
+        if chunks is None and plan_cache:
+            if not conversion.content_hash:
+                conversion.content_hash = file_sha256(_source_path(conversion))
+            plan_key = PlanCache.make_key(conversion.content_hash, max_chars)
 
-        tts_manager = TTSManager(settings.voices_dir)
+            cached = plan_cache.get_plan(plan_key)
+            if cached:
+                # Same bytes were converted before: skip parsing entirely
+                chunks, extraction_stats = cached
+                checkpoint.save_plan(chunks, voice_name, max_chars, resumed)
+                conversion.extraction_stats = extraction_stats or None
+                plan_key = None
 
-        # voice_id is now an edge-tts voice name (e.g., "en-US-AriaNeural")
-        voice_name = conversion.voice_id if conversion.voice_id else None
+        if chunks is None:
+            # Uploads from before lanes existed were never sized
+            extraction = ExtractionProgress(extraction_stats, conversion.estimated_chars or estimate_chars(
+                _source_path(conversion), conversion.file_format
+            ))
+            planned = checkpoint.record_plan(
+                _iter_source_chunks(conversion, max_chars, extraction_stats, extraction),
+                voice_name, max_chars, resumed
+            )
+            if settings.pipeline_enabled:
+                # Fanning out needs the chunk count before synthesis starts
+                chunks = list(planned)
+                conversion.extraction_stats = extraction_stats or None
+                if plan_key:
+                    plan_cache.put_plan(plan_key, chunks, extraction_stats)
+                    plan_key = None
 
-        temp_audio_files = []
-        total_chunks = len(chunks)
+        if chunks is not None and _use_pipeline(len(chunks)):
+            _start_pipeline(db, conversion, checkpoint, len(chunks))
+            return
 
-        conversion.chunks_total = total_chunks
-        conversion.chunks_completed = 0
-        db.commit()
+        output_filename = _output_filename(conversion)
+        output_path = os.path.join(settings.output_dir, output_filename)
+        os.makedirs(settings.output_dir, exist_ok=True)
 
-        for idx, chunk in enumerate(chunks):
-            temp_output = os.path.join(tempfile.gettempdir(), f"chunk_{conversion_id}_{idx}.mp3")
-            tts_manager.synthesize(chunk, temp_output, voice_name)
-            temp_audio_files.append(temp_output)
+        chunks_appended, output_bytes = checkpoint.load_state()
 
-            progress = ((idx + 1) / total_chunks) * 100
-            conversion.progress = progress
-            conversion.chunks_completed = idx + 1
-            db.commit()
+        with ChunkAppender(output_path, chunks_appended, output_bytes, checkpoint.timeline_path()) as appender:
+            if chunks is not None:
+                total_chunks = len(chunks)
+                # Segments synthesized before a crash but never appended are reused
+                done = [idx for idx in range(appender.next_index, total_chunks) if checkpoint.has_segment(idx)]
+                pending = (
+                    (idx, chunks[idx]) for idx in range(appender.next_index, total_chunks)
+                    if not checkpoint.has_segment(idx)
+                )
+            else:
+                # Synthesis starts while the rest of the book is still being
+                # extracted; the total is known once extraction finishes
+                total_chunks = None
+                # The chunks of a resumed plan are extracted again, but only
+                # checked against it up to where the last run got
+                done = [idx for idx in range(appender.next_index, len(resumed or ())) if checkpoint.has_segment(idx)]
+                skipped = set(done)
+                pending = (
+                    (idx, text) for idx, text in enumerate(planned)
+                    if idx >= appender.next_index and idx not in skipped
+                )
 
-        output_filename = f"{os.path.splitext(conversion.filename)[0]}.mp3"
-        output_path = os.path.join(settings.output_dir, output_filename)
+            # The output grows as chunks finish, so expose it from the start
+            conversion.output_path = output_filename
+            conversion.chunks_total = total_chunks
+            conversion.chunks_completed = appender.next_index + len(done)
+            if total_chunks:
+                conversion.progress = (conversion.chunks_completed / total_chunks) * 100
+            elif not resumed:
+                conversion.progress = 0.0
+            reporter = ProgressReporter(db, conversion)
+            reporter.update(force=True)
+
+            merging = Stopwatch()
+
+            def append_segment(idx: int):
+                with merging:
+                    if appender.add(idx, checkpoint.segment_path(idx)):
+                        checkpoint.save_state(appender.next_index, appender.bytes_written)
+
+            for idx in done:
+                append_segment(idx)
+
+            # Chunk indices in the order synthesize_many pulls them
+            todo: List[int] = []
+            # Chunks of the plan pulled so far
+            planned_chunks = len(resumed or ())
 
-        AudioProcessor.merge_audio_files(temp_audio_files, output_path)
+            def pending_texts() -> Iterator[str]:
+                nonlocal planned_chunks, total_chunks
+                for idx, text in pending:
+                    if not todo:
+                        # The time slice starts with synthesis, not with the
+                        # setup and the extraction (again, when resumed)
+                        # before the first chunk
+                        preemption.start()
+                    elif preemption.due():
+                        # Chunks in flight finish; the rest wait for the next run
+                        return
+                    planned_chunks = idx + 1
+                    todo.append(idx)
+                    yield text
+                if chunks is None:
+                    # Extraction has finished
+                    total_chunks = planned_chunks
+
+            # zip() pulls the text first, so todo[pos] is set by the time
+            # the matching path is requested
+            part_paths = (f"{checkpoint.segment_path(todo[pos])}.part" for pos in itertools.count())
+
+            def on_chunk_done(pos: int, part_path: str):
+                idx = todo[pos]
+                # Only complete segments get their final name, so a crash
+                # mid-synthesis never leaves a truncated segment behind
+                os.replace(part_path, checkpoint.segment_path(idx))
+                # Chunks finish out of order; the appender writes them in order
+                append_segment(idx)
+                conversion.chunks_completed += 1
+                if total_chunks is not None:
+                    conversion.chunks_total = total_chunks
+                    conversion.progress = (conversion.chunks_completed / total_chunks) * 100
+                else:
+                    # The chunks planned so far cover the share of the book extracted
+                    conversion.progress = (
+                        conversion.chunks_completed / planned_chunks * extraction.fraction * 100
+                    )
+                reporter.update()
+
+            failures: List[dict] = []
+
+            def on_chunk_failed(pos: int, part_path: str, exc: Exception):
+                _record_chunk_failure(failures, todo[pos], part_path, exc)
+
+            synthesis_started = time.perf_counter()
+            tts_manager.synthesize_many(
+                pending_texts(),
+                part_paths,
+                voice_name,
+                concurrency=settings.tts_concurrency,
+                progress_callback=on_chunk_done,
+                failure_callback=on_chunk_failed
+            )
+            if chunks is None:
+                # A preempted run stopped pulling: keep what was planned
+                # for the next one
+                planned.close()
+            # Appending is its own stage, and so is extraction, which streams
+            # into synthesis from its own thread
+            observe_stage("synthesis", conversion.file_format, time.perf_counter() - synthesis_started - merging.seconds)
+            observe_stage("merge", conversion.file_format, merging.seconds)
+
+        if extraction_stats:
+            conversion.extraction_stats = extraction_stats
+        if plan_key and total_chunks is not None:
+            # Extraction streamed into synthesis, so the plan is complete only now
+            plan_cache.put_plan(plan_key, checkpoint.load_plan(voice_name), extraction_stats)
+        if failures:
+            conversion.chunks_total = total_chunks
+            raise ChunkSynthesisError.from_failures(failures)
+        if preemption.preempted:
+            # Everything synthesized is appended and checkpointed, so the
+            # next run picks up from here
+            if requeue(db, conversion):
+                PREEMPTIONS.labels(conversion.lane).inc()
+                publish_progress(conversion)
+            return
+
+        conversion.chunks_total = appender.next_index
+        output_filename = _finish_output(conversion, output_path, appender)
+        checkpoint.clear()
 
         conversion.status = ConversionStatus.COMPLETED
         conversion.output_path = output_filename
         conversion.progress = 100.0
         conversion.completed_at = datetime.utcnow()
         db.commit()
+        publish_progress(conversion)
+        observe_stage("total", conversion.file_format, time.perf_counter() - started)
+        CONVERSIONS.labels("completed").inc()
 
     except Exception as e:
         conversion.status = ConversionStatus.FAILED
         conversion.error_message = str(e)
         db.commit()
+        publish_progress(conversion)
         raise
     finally:
-        db.close()
\ No newline at end of file
+        if sizing:
+            sizing.save()
+        if preemption_db is not None:
+            preemption_db.close()
+        db.close()
+
+
+def _start_pipeline(db: Session, conversion: Conversion, checkpoint: ConversionCheckpoint, total_chunks: int):
+    """Fan the chunk plan out over synthesis tasks and merge when all finish.
+
+    Segments are exchanged through the checkpoint directory, which must be on
+    storage shared by every worker that consumes the conversions queue.
+    """
+    chunks_appended, output_bytes = checkpoint.load_state()
+    output_path = os.path.join(settings.output_dir, _output_filename(conversion))
+    if not os.path.exists(output_path) or os.path.getsize(output_path) < output_bytes:
+        # The merge will start the output over, so every chunk is needed
+        chunks_appended = 0
+
+    done = sum(1 for idx in range(chunks_appended, total_chunks) if checkpoint.has_segment(idx))
+
+    conversion.chunks_total = total_chunks
+    conversion.chunks_completed = chunks_appended + done
+    conversion.progress = (conversion.chunks_completed / total_chunks) * 100
+    db.commit()
+    publish_progress(conversion)
+
+    # Ranges run in the conversion's lane; between them workers take turns
+    # with the other lanes, so pipelined jobs need no preemption
+    queue = lane_queue(conversion.lane)
+    range_size = settings.pipeline_range_size
+    header = [
+        synthesize_chunk_range.s(conversion.id, start, min(start + range_size, total_chunks)).set(queue=queue)
+        for start in range(chunks_appended, total_chunks, range_size)
+    ]
+    result = chord(header)(merge_chunk_ranges.s(conversion_id=conversion.id).set(queue=queue))
+
+    # Cancelling revokes the merge; range tasks stop on the CANCELLED status
+    conversion.task_id = result.id
+    db.commit()
+
+
+@celery_app.task(base=ConversionTask, bind=True, acks_late=True, reject_on_worker_lost=True)
+def synthesize_chunk_range(self, conversion_id: int, start: int, end: int):
+    db = SessionLocal()
+    sizing = get_chunk_size_tuner()
+
+    try:
+        conversion = db.query(Conversion).filter(Conversion.id == conversion_id).first()
+        if conversion.status == ConversionStatus.CANCELLED:
+            return 0
+
+        voice_name = conversion.voice_id if conversion.voice_id else None
+        checkpoint = ConversionCheckpoint(settings.checkpoint_dir, conversion_id)
+        chunks = checkpoint.load_plan(voice_name)
+        if chunks is None:
+            raise ValueError("Chunk plan is missing or does not match the conversion")
+
+        todo = [idx for idx in range(start, end) if not checkpoint.has_segment(idx)]
+        reporter = ProgressReporter(db, conversion)
+
+        def on_chunk_done(pos: int, part_path: str):
+            os.replace(part_path, checkpoint.segment_path(todo[pos]))
+            # Several workers report into the same row, so increment in SQL
+            reporter.increment()
+
+        failures: List[dict] = []
+
+        def on_chunk_failed(pos: int, part_path: str, exc: Exception):
+            _record_chunk_failure(failures, todo[pos], part_path, exc)
+
+        tts_manager = _tts_manager(sizing)
+        synthesis_started = time.perf_counter()
+        try:
+            tts_manager.synthesize_many(
+                [chunks[idx] for idx in todo],
+                [f"{checkpoint.segment_path(idx)}.part" for idx in todo],
+                voice_name,
+                concurrency=settings.tts_concurrency,
+                progress_callback=on_chunk_done,
+                failure_callback=on_chunk_failed
+            )
+        finally:
+            reporter.flush()
+        observe_stage("range_synthesis", conversion.file_format, time.perf_counter() - synthesis_started)
+        if failures:
+            raise ChunkSynthesisError.from_failures(failures)
+        return len(todo)
+    finally:
+        if sizing:
+            sizing.save()
+        db.close()
+
+
+@celery_app.task(base=ConversionTask, bind=True, acks_late=True, reject_on_worker_lost=True)
+def merge_chunk_ranges(self, range_results: List[int], conversion_id: int):
+    db = SessionLocal()
+
+    try:
+        conversion = db.query(Conversion).filter(Conversion.id == conversion_id).first()
+        if conversion.status == ConversionStatus.CANCELLED:
+            return
+
+        checkpoint = ConversionCheckpoint(settings.checkpoint_dir, conversion_id)
+        total_chunks = conversion.chunks_total
+
+        output_filename = _output_filename(conversion)
+        output_path = os.path.join(settings.output_dir, output_filename)
+        os.makedirs(settings.output_dir, exist_ok=True)
+
+        chunks_appended, output_bytes = checkpoint.load_state()
+        merge_started = time.perf_counter()
+
+        with ChunkAppender(output_path, chunks_appended, output_bytes, checkpoint.timeline_path()) as appender:
+            for idx in range(appender.next_index, total_chunks):
+                if not checkpoint.has_segment(idx):
+                    raise ValueError(f"Audio for chunk {idx} is missing")
+                appender.add(idx, checkpoint.segment_path(idx))
+                checkpoint.save_state(appender.next_index, appender.bytes_written)
+
+        observe_stage("merge", conversion.file_format, time.perf_counter() - merge_started)
+        output_filename = _finish_output(conversion, output_path, appender)
+        checkpoint.clear()
+
+        conversion.status = ConversionStatus.COMPLETED
+        conversion.output_path = output_filename
+        conversion.progress = 100.0
+        conversion.completed_at = datetime.utcnow()
+        db.commit()
+        publish_progress(conversion)
+        observe_total(conversion.file_format, conversion.started_at)
+        CONVERSIONS.labels("completed").inc()
+    finally:
+        db.close()
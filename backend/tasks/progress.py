@@ -0,0 +1,101 @@
+import logging
+import time
+from typing import Optional
+import redis
+from sqlalchemy.orm import Session
+from api.schemas.conversion import ConversionResponse
+from config import get_settings
+from models.conversion import Conversion
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressPublisher:
+    """Publishes conversion snapshots to a Redis channel for the API to fan out."""
+
+    # After a failed publish, stay quiet for this long instead of stalling
+    # every chunk on an unreachable Redis
+    RETRY_SECONDS = 30
+
+    def __init__(self, redis_url: str, channel: str):
+        self.channel = channel
+        self.client = redis.Redis.from_url(redis_url, socket_timeout=1, socket_connect_timeout=1)
+        self._failed_at: Optional[float] = None
+
+    def publish(self, conversion: Conversion):
+        if self._failed_at is not None and time.monotonic() - self._failed_at < self.RETRY_SECONDS:
+            return
+        try:
+            self.client.publish(self.channel, ConversionResponse.from_orm_with_eta(conversion).model_dump_json())
+            self._failed_at = None
+        except redis.RedisError:
+            logger.warning("Could not publish conversion progress", exc_info=True)
+            self._failed_at = time.monotonic()
+
+
+class ProgressReporter:
+    """Reports a conversion's progress as chunks finish.
+
+    Every update is published right away, but the row is written at most
+    every commit_interval seconds; status changes are committed by the
+    caller as before.
+    """
+
+    def __init__(self, db: Session, conversion: Conversion, commit_interval: Optional[float] = None):
+        self.db = db
+        self.conversion = conversion
+        self.commit_interval = (
+            get_settings().progress_commit_interval if commit_interval is None else commit_interval
+        )
+        self._committed_at = time.monotonic()
+        # Completions not yet added to a row shared with other workers
+        self._increments = 0
+
+    def _due(self) -> bool:
+        return time.monotonic() - self._committed_at >= self.commit_interval
+
+    def update(self, force: bool = False):
+        """Publish the conversion's current attributes, committing when due."""
+        if force or self._due():
+            self.db.commit()
+            self._committed_at = time.monotonic()
+        publish_progress(self.conversion)
+
+    def increment(self, force: bool = False):
+        """Count one finished chunk of a conversion that several workers share.
+
+        Increments are added in SQL, batched, so the published snapshot is
+        only as fresh as the last commit.
+        """
+        self._increments += 1
+        if force or self._due():
+            self.flush()
+
+    def flush(self):
+        if not self._increments:
+            return
+        self.db.query(Conversion).filter(Conversion.id == self.conversion.id).update({
+            Conversion.chunks_completed: Conversion.chunks_completed + self._increments,
+            Conversion.progress: (Conversion.chunks_completed + self._increments) * 100.0 / Conversion.chunks_total,
+        }, synchronize_session=False)
+        self.db.commit()
+        self._increments = 0
+        self._committed_at = time.monotonic()
+        publish_progress(self.conversion)
+
+
+# Singleton instance
+_progress_publisher: Optional[ProgressPublisher] = None
+
+
+def get_progress_publisher() -> ProgressPublisher:
+    global _progress_publisher
+    if _progress_publisher is None:
+        settings = get_settings()
+        _progress_publisher = ProgressPublisher(settings.redis_url, settings.progress_channel)
+    return _progress_publisher
+
+
+def publish_progress(conversion: Conversion):
+    """Tell connected clients about the conversion's current state."""
+    get_progress_publisher().publish(conversion)
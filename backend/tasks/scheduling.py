@@ -0,0 +1,235 @@
+"""Priority lanes and fair sharing of the conversion workers.
+
+Uploads are classified by estimated characters into lanes, each with its
+own Celery queue. Workers take short jobs first and turns between the
+other lanes, so no lane starves, and a long job yields its worker at a
+chunk boundary when shorter work has waited for one. Each submitter has at most
+SCHEDULE_MAX_QUEUED_PER_SUBMITTER conversions queued per lane; the rest
+wait in the database and are queued one by one as theirs start, so the
+queues interleave submitters instead of serving one batch after another.
+"""
+import os
+import time
+import zipfile
+from typing import Optional, Set
+from uuid import uuid4
+from kombu.utils.scheduling import round_robin_cycle
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, aliased
+from config import get_settings
+from models.conversion import Conversion, ConversionStatus
+
+# Shortest first; "conversions" was the only queue before lanes existed
+LANES = ("short", "standard", "long")
+LANE_QUEUES = {"short": "conversions.short", "standard": "conversions", "long": "conversions.long"}
+
+# Rough text per page of a book, for formats measured in pages
+CHARS_PER_PAGE = 2000
+IMAGE_FORMATS = {".png", ".jpg", ".jpeg", ".tiff", ".tif", ".bmp", ".webp"}
+# Markup of EPUB and DOCX documents is about twice their text
+MARKUP_PER_CHAR = 2
+
+
+def estimate_chars(path: str, file_format: str) -> int:
+    """Cheap estimate of a file's text length, without extracting it."""
+    file_format = file_format.lower()
+    if file_format in IMAGE_FORMATS:
+        return CHARS_PER_PAGE
+    try:
+        if file_format == ".pdf":
+            import fitz
+
+            with fitz.open(path) as doc:
+                return doc.page_count * CHARS_PER_PAGE
+        if file_format in (".epub", ".docx"):
+            with zipfile.ZipFile(path) as archive:
+                markup = sum(
+                    info.file_size for info in archive.infolist()
+                    if info.filename.endswith((".xhtml", ".html", ".htm", "word/document.xml"))
+                )
+            return markup // MARKUP_PER_CHAR
+    except Exception:
+        # Unreadable files fail in the worker with a proper error; size them
+        # by their bytes meanwhile
+        pass
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        # Gone already; the worker reports that too
+        return 0
+
+
+def classify(estimated_chars: int) -> str:
+    settings = get_settings()
+    if estimated_chars <= settings.schedule_short_max_chars:
+        return "short"
+    if estimated_chars >= settings.schedule_long_min_chars:
+        return "long"
+    return "standard"
+
+
+def lane_queue(lane: Optional[str]) -> str:
+    # Conversions from before lanes existed run as standard
+    return LANE_QUEUES.get(lane, LANE_QUEUES["standard"])
+
+
+class ShortFirstCycle(round_robin_cycle):
+    """Redis queue order for workers: the short lane, then the others in turn.
+
+    Set as the broker's queue_order_strategy; a worker asks for the
+    queues in this order and takes from the first that has a job.
+    """
+
+    def consume(self, n):
+        short = LANE_QUEUES["short"]
+        return sorted(self.items[:n], key=lambda queue: queue != short)
+
+
+def _queued_count(submitter: Optional[str], lane: Optional[str]):
+    """SQL count of the submitter's conversions queued in the lane."""
+    queued = aliased(Conversion)
+    return select(func.count(queued.id)).where(
+        queued.status == ConversionStatus.PENDING,
+        queued.task_id.isnot(None),
+        queued.submitter == submitter,
+        queued.lane == lane
+    ).scalar_subquery()
+
+
+def send(conversion: Conversion, task_id: str):
+    """Put the conversion's task on its lane's queue."""
+    from tasks.conversion_tasks import convert_to_audiobook
+
+    convert_to_audiobook.apply_async((conversion.id,), queue=lane_queue(conversion.lane), task_id=task_id)
+
+
+def submit(db: Session, conversion: Conversion) -> bool:
+    """Queue a committed PENDING conversion unless its submitter is at the limit.
+
+    The conversion is claimed by setting its task id in a single UPDATE
+    that also checks the limit, so concurrent submits (uploads, releases,
+    requeues) can neither exceed it nor queue one conversion twice.
+    Returns whether it was queued; otherwise it waits for release_waiting().
+    """
+    limit = get_settings().schedule_max_queued_per_submitter
+    task_id = str(uuid4())
+    claim = db.query(Conversion).filter(
+        Conversion.id == conversion.id,
+        Conversion.status == ConversionStatus.PENDING,
+        Conversion.task_id.is_(None)
+    )
+    if limit:
+        # On PostgreSQL, concurrent submits for the same submitter and lane
+        # wait here for each other, so each counts the others' claims.
+        # SQLite runs every write statement alone anyway.
+        db.query(Conversion.id).filter(
+            Conversion.status == ConversionStatus.PENDING,
+            Conversion.submitter == conversion.submitter,
+            Conversion.lane == conversion.lane
+        ).with_for_update().all()
+        claim = claim.filter(_queued_count(conversion.submitter, conversion.lane) < limit)
+    claimed = claim.update({Conversion.task_id: task_id}, synchronize_session=False)
+    db.commit()
+    if claimed:
+        try:
+            send(conversion, task_id)
+        except Exception:
+            # Not queued after all, so leave it waiting
+            db.query(Conversion).filter(
+                Conversion.id == conversion.id, Conversion.task_id == task_id
+            ).update({Conversion.task_id: None}, synchronize_session=False)
+            db.commit()
+            raise
+    db.refresh(conversion)
+    return bool(claimed)
+
+
+def release_waiting(db: Session, submitter: Optional[str], lane: Optional[str]) -> Optional[Conversion]:
+    """Queue the submitter's oldest waiting conversion in the lane, if any.
+
+    Called whenever one of their queued conversions leaves the queue.
+    """
+    while True:
+        waiting = db.query(Conversion).filter(
+            Conversion.status == ConversionStatus.PENDING,
+            Conversion.task_id.is_(None),
+            Conversion.submitter == submitter,
+            Conversion.lane == lane
+        ).order_by(Conversion.created_at, Conversion.id).first()
+        if waiting is None:
+            return None
+        if submit(db, waiting):
+            return waiting
+        if waiting.task_id is None:
+            # At the limit after all
+            return None
+        # A concurrent release queued this one; try the next
+
+
+class PreemptionCheck:
+    """Tells a running job, at chunk boundaries, to give its worker up.
+
+    A job yields once it has synthesized for SCHEDULE_TIME_SLICE seconds
+    and a conversion of a shorter lane has been queued for two checks in a
+    row, CHECK_SECONDS apart; one an idle worker can take is gone by then.
+    The freed worker takes the shorter job, as workers prefer the short lane
+    and rotate the lane they last served to the back.
+    """
+
+    CHECK_SECONDS = 5.0
+    # Queued shorter jobs remembered between checks
+    MAX_WAITING = 100
+
+    def __init__(self, db: Session, lane: Optional[str], time_slice: Optional[float] = None):
+        self.db = db
+        self.shorter = LANES[:LANES.index(lane)] if lane in LANES else ()
+        self.time_slice = get_settings().schedule_time_slice if time_slice is None else time_slice
+        self._started = time.monotonic()
+        self._checked = 0.0
+        self._waiting: Set[int] = set()
+        self.preempted = False
+
+    def start(self):
+        """Start the time slice; the job only prepared until now."""
+        self._started = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.shorter) and self.time_slice > 0
+
+    def due(self) -> bool:
+        if self.preempted:
+            return True
+        now = time.monotonic()
+        if not self.enabled or now - self._started < self.time_slice or now - self._checked < self.CHECK_SECONDS:
+            return False
+        self._checked = now
+        waiting = {conversion_id for conversion_id, in self.db.query(Conversion.id).filter(
+            Conversion.status == ConversionStatus.PENDING,
+            Conversion.task_id.isnot(None),
+            Conversion.lane.in_(self.shorter)
+        ).order_by(Conversion.id).limit(self.MAX_WAITING)}
+        self.preempted = bool(waiting & self._waiting)
+        self._waiting = waiting
+        return self.preempted
+
+
+def requeue(db: Session, conversion: Conversion) -> bool:
+    """Give a preempted conversion back to the scheduler.
+
+    The row only goes back to PENDING if it is still PROCESSING, so a
+    cancellation that raced the preemption wins. It then counts against
+    its submitter's limit like any other: it is queued at the back of its
+    lane, or waits until one of theirs starts.
+    """
+    updated = db.query(Conversion).filter(
+        Conversion.id == conversion.id,
+        Conversion.status == ConversionStatus.PROCESSING
+    ).update({Conversion.status: ConversionStatus.PENDING, Conversion.task_id: None}, synchronize_session=False)
+    db.commit()
+    db.refresh(conversion)
+    if not updated:
+        return False
+
+    submit(db, conversion)
+    return True
@@ -0,0 +1,22 @@
+from benchmarks.bench_chunker import PAGE_CHARS, make_book
+from tts.chunker import TextChunker
+
+
+def _streamed(chunker: TextChunker, text: str, piece_chars: int):
+    return list(chunker.iter_chunks(text[i:i + piece_chars] for i in range(0, len(text), piece_chars)))
+
+
+def test_streamed_matches_whole_for_unpunctuated_text():
+    text = make_book(0.2, punctuated=False)
+    chunker = TextChunker(max_chars=500)
+    assert _streamed(chunker, text, PAGE_CHARS) == chunker.chunk_by_sentences(text)
+
+
+def test_streamed_matches_whole_for_text_without_spaces():
+    text = "".join(chr(ord("a") + i % 26) for i in range(20000))
+    for max_bytes in (None, 300):
+        chunker = TextChunker(max_chars=500, max_bytes=max_bytes)
+        whole = chunker.chunk_by_sentences(text)
+        for piece_chars in (7, 499, 501, PAGE_CHARS):
+            assert _streamed(chunker, text, piece_chars) == whole
+        assert "".join(whole) == text
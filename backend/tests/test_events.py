@@ -0,0 +1,33 @@
+import asyncio
+import json
+
+import pytest
+
+from api import events
+from api.events import ProgressBroadcaster
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def test_malformed_messages_do_not_stop_the_listener(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        events.aioredis.Redis, "from_url",
+        lambda url, **kwargs: fakeredis.aioredis.FakeRedis(server=server)
+    )
+
+    async def run():
+        broadcaster = ProgressBroadcaster("redis://fake", "progress")
+        publisher = fakeredis.aioredis.FakeRedis(server=server)
+        async with broadcaster.subscribe() as subscriber:
+            while not (await publisher.pubsub_numsub("progress"))[0][1]:
+                await asyncio.sleep(0.01)
+
+            await publisher.publish("progress", b"\xff not json")
+            await publisher.publish("progress", "[1, 2]")
+            await publisher.publish("progress", json.dumps({"id": 7, "status": "completed"}))
+            received = await asyncio.wait_for(subscriber.next(), timeout=5)
+            assert not broadcaster._listener.done()
+        return received
+
+    assert asyncio.run(run()) == [{"id": 7, "status": "completed"}]
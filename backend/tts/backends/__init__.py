@@ -0,0 +1 @@
+# TTS backends package
@@ -0,0 +1,39 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class PermanentTTSError(Exception):
+    """A request the engine can never fulfil, e.g. for a voice it does not have."""
+
+
+class BaseTTSBackend(ABC):
+    """A speech engine that turns one chunk of text into an MP3 file.
+
+    Engines should produce MPEG-2 Layer III at 24 kHz mono, as edge-tts
+    does, so chunks can be concatenated frame by frame without re-encoding.
+    """
+
+    # Short name used in settings and logs
+    name = ""
+    default_voice = ""
+
+    @property
+    def cache_id(self) -> str:
+        """Identifies the engine in chunk cache keys, so audio from
+        different engines (or engine versions) never mixes."""
+        return self.name
+
+    @abstractmethod
+    async def synthesize(self, text: str, voice: str, output_path: str):
+        """Write the speech for text to output_path as MP3.
+
+        Raise PermanentTTSError for requests that can never succeed (e.g.
+        an unknown voice); any other exception counts as transient and is
+        retried.
+        """
+        pass
+
+    @abstractmethod
+    async def list_voices(self) -> List[dict]:
+        """Return the available voices as {"id", "name", "gender", "locale"}."""
+        pass
@@ -0,0 +1,38 @@
+import edge_tts
+from typing import List
+from tts.backends.base import BaseTTSBackend, PermanentTTSError
+
+class EdgeTTSBackend(BaseTTSBackend):
+    """Microsoft Edge's online neural voices."""
+
+    name = "edge"
+    default_voice = "en-US-AriaNeural"
+
+    @property
+    def cache_id(self) -> str:
+        # Same id chunks were cached under before backends existed
+        return f"{edge_tts.Communicate.__module__}.{edge_tts.Communicate.__qualname__}"
+
+    async def synthesize(self, text: str, voice: str, output_path: str):
+        try:
+            communicate = edge_tts.Communicate(text, voice)
+        except ValueError as exc:
+            # The voice name is checked before anything is sent
+            raise PermanentTTSError(str(exc)) from exc
+        await communicate.save(output_path)
+
+    async def list_voices(self) -> List[dict]:
+        voices = []
+        for v in await edge_tts.list_voices():
+            # Extract friendly name from ShortName (e.g., "en-US-AriaNeural" -> "Aria")
+            short_name = v["ShortName"]
+            name_parts = short_name.split("-")
+            friendly_name = name_parts[2].replace("Neural", "").replace("Multilingual", " (Multi)")
+
+            voices.append({
+                "id": short_name,
+                "name": friendly_name,
+                "gender": v["Gender"],
+                "locale": v["Locale"],
+            })
+        return voices
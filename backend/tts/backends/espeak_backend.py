@@ -0,0 +1,37 @@
+from typing import List
+from tts.backends.local_backend import LocalProcessBackend
+
+class EspeakBackend(LocalProcessBackend):
+    """eSpeak NG: formant synthesis, robotic but tiny and very fast."""
+
+    name = "espeak"
+    default_voice = "en-us"
+
+    def __init__(self, binary: str = "espeak-ng", ffmpeg_binary: str = "ffmpeg"):
+        super().__init__(ffmpeg_binary)
+        self.binary = binary
+
+    async def synthesize(self, text: str, voice: str, output_path: str):
+        # Text comes in on stdin, a WAV file goes out on stdout
+        wav = await self._run([self.binary, "-v", voice, "--stdout"], text.encode("utf-8"))
+        await self._encode(wav, ["-f", "wav"], output_path)
+
+    async def list_voices(self) -> List[dict]:
+        output = await self._run([self.binary, "--voices"], b"")
+        voices = []
+        # Columns: Pty Language Age/Gender VoiceName File Other Languages
+        for line in output.decode("utf-8", "replace").splitlines()[1:]:
+            parts = line.split()
+            if len(parts) < 4:
+                continue
+            language, gender = parts[1], parts[2].rpartition("/")[2]
+            locale = "-".join(
+                part.lower() if i == 0 else part.upper() for i, part in enumerate(language.split("-"))
+            )
+            voices.append({
+                "id": language,
+                "name": parts[3].replace("_", " "),
+                "gender": {"M": "Male", "F": "Female"}.get(gender, "Unknown"),
+                "locale": locale,
+            })
+        return voices
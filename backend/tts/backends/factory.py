@@ -0,0 +1,36 @@
+from typing import Dict, Optional
+from config import get_settings
+from tts.backends.base import BaseTTSBackend
+from tts.backends.edge_backend import EdgeTTSBackend
+from tts.backends.espeak_backend import EspeakBackend
+from tts.backends.fake_backend import FakeTTSBackend
+from tts.backends.piper_backend import PiperBackend
+
+class TTSBackendFactory:
+    _instances: Dict[str, BaseTTSBackend] = {}
+
+    @classmethod
+    def _create(cls, name: str) -> BaseTTSBackend:
+        settings = get_settings()
+        if name == "edge":
+            return EdgeTTSBackend()
+        if name == "piper":
+            return PiperBackend(
+                settings.piper_models_dir,
+                settings.piper_binary,
+                settings.ffmpeg_binary,
+                settings.piper_default_voice or None
+            )
+        if name == "espeak":
+            return EspeakBackend(settings.espeak_binary, settings.ffmpeg_binary)
+        if name == "fake":
+            return FakeTTSBackend(settings.fake_tts_latency, settings.fake_tts_seconds_per_char)
+        raise ValueError(f"Unknown TTS backend: {name}")
+
+    @classmethod
+    def get_backend(cls, name: Optional[str] = None) -> BaseTTSBackend:
+        """Get the named backend, by default the one configured in settings."""
+        name = name or get_settings().tts_backend
+        if name not in cls._instances:
+            cls._instances[name] = cls._create(name)
+        return cls._instances[name]
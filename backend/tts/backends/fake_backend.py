@@ -0,0 +1,35 @@
+import asyncio
+from typing import List
+from audio.mp3 import silent_mp3
+from tts.backends.base import BaseTTSBackend
+
+class FakeTTSBackend(BaseTTSBackend):
+    """Deterministic stand-in for load testing the pipeline without a TTS service.
+
+    Writes silence as long as the text would take to read aloud, after a
+    simulated request latency of `latency` + `seconds_per_char` * len(text).
+    """
+
+    name = "fake"
+    default_voice = "fake-en-US-A"
+    # Typical speaking rate
+    CHARS_PER_SECOND = 15
+
+    def __init__(self, latency: float = 0.0, seconds_per_char: float = 0.0):
+        self.latency = latency
+        self.seconds_per_char = seconds_per_char
+
+    async def synthesize(self, text: str, voice: str, output_path: str):
+        delay = self.latency + self.seconds_per_char * len(text)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        with open(output_path, "wb") as f:
+            f.write(silent_mp3(len(text) / self.CHARS_PER_SECOND))
+
+    async def list_voices(self) -> List[dict]:
+        return [
+            {"id": "fake-en-US-A", "name": "Fake A", "gender": "Female", "locale": "en-US"},
+            {"id": "fake-en-US-B", "name": "Fake B", "gender": "Male", "locale": "en-US"},
+            {"id": "fake-en-GB-C", "name": "Fake C", "gender": "Female", "locale": "en-GB"},
+        ]
@@ -0,0 +1,48 @@
+import asyncio
+from typing import List
+from tts.backends.base import BaseTTSBackend
+
+class LocalProcessBackend(BaseTTSBackend):
+    """Base for engines that run as a local process on the worker host.
+
+    The engine's audio is piped through ffmpeg into the same MP3 format
+    edge-tts produces, so merging never has to transcode.
+    """
+
+    # Output format matching edge-tts; no Xing frame or ID3 tag
+    MP3_ARGS = [
+        "-codec:a", "libmp3lame", "-b:a", "48k", "-ar", "24000", "-ac", "1",
+        "-write_xing", "0", "-id3v2_version", "0", "-f", "mp3",
+    ]
+    # Seconds a single engine or encoder run may take
+    PROCESS_TIMEOUT = 300
+
+    def __init__(self, ffmpeg_binary: str = "ffmpeg"):
+        self.ffmpeg_binary = ffmpeg_binary
+
+    async def _run(self, command: List[str], stdin: bytes) -> bytes:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(stdin), self.PROCESS_TIMEOUT)
+        except BaseException:
+            # Timed out or cancelled: do not leave the process running
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+
+        if process.returncode != 0:
+            message = stderr.decode("utf-8", "replace").strip().splitlines()[-1:] or ["no output"]
+            raise RuntimeError(f"{command[0]} exited with {process.returncode}: {message[0]}")
+        return stdout
+
+    async def _encode(self, audio: bytes, input_args: List[str], output_path: str):
+        await self._run(
+            [self.ffmpeg_binary, "-loglevel", "error", "-y", *input_args, "-i", "pipe:0", *self.MP3_ARGS, output_path],
+            audio
+        )
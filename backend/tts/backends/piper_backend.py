@@ -0,0 +1,64 @@
+import json
+import os
+from typing import List, Optional
+from tts.backends.base import PermanentTTSError
+from tts.backends.local_backend import LocalProcessBackend
+
+class PiperBackend(LocalProcessBackend):
+    """Piper: neural voices running offline on the CPU.
+
+    Each voice is a model file <models_dir>/<voice>.onnx with its
+    <voice>.onnx.json config next to it, as downloaded from the Piper
+    voice repository (e.g. en_US-lessac-medium).
+    """
+
+    name = "piper"
+
+    def __init__(self, models_dir: str, binary: str = "piper", ffmpeg_binary: str = "ffmpeg",
+                 default_voice: Optional[str] = None):
+        super().__init__(ffmpeg_binary)
+        self.models_dir = models_dir
+        self.binary = binary
+        self.default_voice = default_voice or "en_US-lessac-medium"
+
+    def _model_path(self, voice: str) -> str:
+        path = os.path.join(self.models_dir, f"{os.path.basename(voice)}.onnx")
+        if not os.path.exists(path):
+            raise PermanentTTSError(f"Unknown Piper voice: {voice}")
+        return path
+
+    def _read_config(self, model_path: str) -> dict:
+        try:
+            with open(f"{model_path}.json", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    async def synthesize(self, text: str, voice: str, output_path: str):
+        model_path = self._model_path(voice)
+        sample_rate = self._read_config(model_path).get("audio", {}).get("sample_rate", 22050)
+
+        # Raw 16-bit mono samples at the model's rate on stdout
+        raw = await self._run([self.binary, "--model", model_path, "--output-raw"], text.encode("utf-8"))
+        await self._encode(raw, ["-f", "s16le", "-ar", str(sample_rate), "-ac", "1"], output_path)
+
+    async def list_voices(self) -> List[dict]:
+        if not os.path.isdir(self.models_dir):
+            return []
+
+        voices = []
+        for filename in sorted(os.listdir(self.models_dir)):
+            if not filename.endswith(".onnx"):
+                continue
+            voice = filename[:-len(".onnx")]
+            config = self._read_config(os.path.join(self.models_dir, filename))
+            # Names look like <lang>_<REGION>-<dataset>-<quality>
+            locale = config.get("language", {}).get("code", voice.split("-")[0]).replace("_", "-")
+            dataset = config.get("dataset", voice.split("-")[1] if "-" in voice else voice)
+            voices.append({
+                "id": voice,
+                "name": dataset.replace("_", " ").title(),
+                "gender": "Unknown",
+                "locale": locale,
+            })
+        return voices
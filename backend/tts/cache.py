@@ -0,0 +1,43 @@
+import hashlib
+import json
+from typing import Optional
+from config import get_settings
+from storage.disk_cache import DiskLRUCache
+
+class ChunkCache(DiskLRUCache):
+    """Content-addressed store of synthesized chunks shared across conversions."""
+
+    SUFFIX = ".mp3"
+
+    @staticmethod
+    def make_key(text: str, voice: str, **params) -> str:
+        """Hash normalized chunk text together with the voice and TTS parameters."""
+        payload = json.dumps(
+            {"text": " ".join(text.split()), "voice": voice, "params": params},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, output_path: str) -> bool:
+        """Copy a cached chunk to output_path. Returns False on a miss."""
+        return self.get_file(key, output_path)
+
+    def put(self, key: str, source_path: str):
+        """Store a freshly synthesized chunk, evicting the least recently used entries."""
+        self.put_file(key, source_path)
+
+
+# Singleton instance
+_chunk_cache: Optional[ChunkCache] = None
+
+
+def get_chunk_cache() -> Optional[ChunkCache]:
+    """Get the shared chunk cache, or None when caching is disabled."""
+    global _chunk_cache
+    settings = get_settings()
+    if settings.tts_cache_max_bytes <= 0:
+        return None
+    if _chunk_cache is None:
+        _chunk_cache = ChunkCache(settings.tts_cache_dir, settings.tts_cache_max_bytes)
+    return _chunk_cache
@@ -0,0 +1,156 @@
+import json
+import math
+import os
+from typing import Dict, Optional, Set, Tuple
+from config import get_settings
+from storage.locking import file_lock
+
+class ChunkSizeTuner:
+    """Learns the chunk size that gives the best TTS throughput per voice.
+
+    Every uncached synthesis is recorded under the bucket of its length
+    (bucket 500 holds chunks of 401-500 characters) as a moving average of
+    characters per second and seconds per request. Small chunks pay the
+    per-request overhead over and over, large ones run into slow requests
+    and timeouts; the tuner hill-climbs between the configured bounds
+    towards the bucket with the highest throughput, trying one untested
+    neighbour of the current best at a time.
+
+    Measurements live in a JSON file so every worker learns from the others.
+    """
+
+    STEP = 100
+    # Samples a bucket needs before its averages are trusted
+    MIN_SAMPLES = 20
+    # Weight of each new sample in the moving averages
+    SMOOTHING = 0.05
+
+    def __init__(
+        self,
+        stats_path: str,
+        min_chars: int,
+        max_chars: int,
+        default_chars: int,
+        max_latency: Optional[float] = None
+    ):
+        self.stats_path = stats_path
+        self.min_chars = self._bucket(min_chars)
+        self.max_chars = max(self.min_chars, max_chars // self.STEP * self.STEP)
+        self.default_chars = default_chars
+        self.max_latency = max_latency
+        self._voices: Dict[str, Dict[str, dict]] = {}
+        self._dirty: Set[Tuple[str, str]] = set()
+
+    def _bucket(self, chars: int) -> int:
+        return max(1, math.ceil(chars / self.STEP)) * self.STEP
+
+    def _read(self) -> Dict[str, Dict[str, dict]]:
+        try:
+            with open(self.stats_path, encoding="utf-8") as f:
+                return json.load(f).get("voices", {})
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def reload(self):
+        """Pick up measurements other workers saved, keeping unsaved local ones."""
+        voices = self._read()
+        for voice, bucket in self._dirty:
+            voices.setdefault(voice, {})[bucket] = self._voices[voice][bucket]
+        self._voices = voices
+
+    def save(self):
+        """Merge this process's new measurements into the shared file."""
+        if not self._dirty:
+            return
+
+        # Without the lock, measurements another process saves between our
+        # reload and replace would be lost
+        with file_lock(f"{self.stats_path}.lock"):
+            self.reload()
+            tmp_path = f"{self.stats_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"voices": self._voices}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.stats_path)
+        self._dirty.clear()
+
+    def _update(self, voice: str, chars: int, chars_per_second: float, seconds: float, failed: bool):
+        bucket = str(self._bucket(chars))
+        stats = self._voices.setdefault(voice, {}).get(bucket)
+        if stats is None:
+            stats = {"samples": 0, "failures": 0, "chars_per_second": chars_per_second, "latency_seconds": seconds}
+            self._voices[voice][bucket] = stats
+
+        # Plain average until the bucket has enough samples, then a moving one
+        weight = max(self.SMOOTHING, 1 / (stats["samples"] + 1))
+        stats["chars_per_second"] += weight * (chars_per_second - stats["chars_per_second"])
+        stats["latency_seconds"] += weight * (seconds - stats["latency_seconds"])
+        stats["samples"] += 1
+        if failed:
+            stats["failures"] += 1
+        self._dirty.add((voice, bucket))
+
+    def record(self, voice: str, chars: int, seconds: float):
+        if chars > 0 and seconds > 0:
+            self._update(voice, chars, chars / seconds, seconds, failed=False)
+
+    def record_failure(self, voice: str, chars: int, seconds: float):
+        """A failed request produced nothing, so it counts as zero throughput."""
+        if chars > 0:
+            self._update(voice, chars, 0.0, seconds, failed=True)
+
+    def _usable(self, stats: dict) -> bool:
+        if stats["samples"] < self.MIN_SAMPLES:
+            return False
+        return self.max_latency is None or stats["latency_seconds"] <= self.max_latency
+
+    def chunk_size(self, voice: str) -> int:
+        """Chunk size to plan the next conversion with for this voice."""
+        buckets = {
+            int(size): stats for size, stats in self._voices.get(voice, {}).items()
+            if self.min_chars <= int(size) <= self.max_chars
+        }
+        usable = {size: stats for size, stats in buckets.items() if self._usable(stats)}
+        if not usable:
+            return min(max(self.default_chars, self.min_chars), self.max_chars)
+
+        best = max(usable, key=lambda size: usable[size]["chars_per_second"])
+        # Larger chunks first: per-request overhead is the usual bottleneck
+        for candidate in (best + self.STEP, best - self.STEP):
+            if (self.min_chars <= candidate <= self.max_chars
+                    and buckets.get(candidate, {}).get("samples", 0) < self.MIN_SAMPLES):
+                return candidate
+        return best
+
+    def snapshot(self) -> dict:
+        """Learned chunk size and per-bucket measurements for every voice."""
+        return {
+            voice: {
+                "chunk_chars": self.chunk_size(voice),
+                "buckets": {
+                    int(size): dict(stats) for size, stats in sorted(buckets.items(), key=lambda item: int(item[0]))
+                },
+            }
+            for voice, buckets in sorted(self._voices.items())
+        }
+
+
+# Singleton instance
+_chunk_size_tuner: Optional[ChunkSizeTuner] = None
+
+
+def get_chunk_size_tuner() -> Optional[ChunkSizeTuner]:
+    """Get the shared tuner, or None when adaptive chunking is disabled."""
+    global _chunk_size_tuner
+    settings = get_settings()
+    if not settings.adaptive_chunking:
+        return None
+    if _chunk_size_tuner is None:
+        _chunk_size_tuner = ChunkSizeTuner(
+            settings.tts_stats_path,
+            settings.adaptive_chunk_min_chars,
+            settings.adaptive_chunk_max_chars,
+            settings.chunk_max_chars,
+            settings.adaptive_chunk_max_latency or None
+        )
+    _chunk_size_tuner.reload()
+    return _chunk_size_tuner
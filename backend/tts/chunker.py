@@ -1,36 +1,183 @@
 import re
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
 class TextChunker:
-    def __init__(self, max_chars: int = 500):
+    # Sentence-ending punctuation followed by whitespace
+    SENTENCE_END = re.compile(r'[.!?]\s+')
+    # The same boundary once whitespace is normalized to single spaces
+    SENTENCE_BOUNDARY = re.compile(r'[.!?] ')
+    # Places to break a sentence that is too long on its own, after the mark
+    CLAUSE_BOUNDARY = re.compile(r'[,;:)\]–—] ')
+
+    def __init__(self, max_chars: int = 500, max_bytes: Optional[int] = None):
+        """max_bytes optionally also caps each chunk's UTF-8 size, which is
+        what TTS services meter; non-Latin scripts need 2-3 bytes a character."""
         self.max_chars = max_chars
+        self.max_bytes = max_bytes
 
     def normalize_text(self, text: str) -> str:
         """Normalize whitespace to prevent TTS pausing at line breaks."""
-        # Replace ALL whitespace characters (including Unicode) with regular space
-        # \s matches [ \t\n\r\f\v] and Unicode whitespace
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        # Collapse ALL whitespace runs (including Unicode) into a regular space;
+        # str.split() uses the same whitespace set as \s and is much faster
+        return " ".join(text.split())
+
+    def chunk_by_sentences(self, text: Union[str, Iterable[str]]) -> List[str]:
+        if isinstance(text, str):
+            text = [text]
+        return list(self.iter_chunks(text))
+
+    def iter_chunks(self, parts: Iterable[str]) -> Iterator[str]:
+        """Chunk text that arrives in pieces, yielding chunks as soon as they are full.
 
-    def chunk_by_sentences(self, text: str) -> List[str]:
-        # Normalize text first to remove line breaks
-        text = self.normalize_text(text)
+        Pieces are treated as one continuous text, so a sentence may span
+        several of them; the result matches chunking their concatenation.
+        Sentences longer than the limit are split at a clause boundary,
+        else at whitespace, else at the limit itself.
+        """
+        # Unfinished chunk carried over from earlier pieces
+        carry = ""
+        # Text after the last sentence end, which the next piece may continue
+        tail = ""
+        # Text without punctuation (typical of OCR) is split once the tail
+        # gets this long, so it cannot grow without bound
+        max_tail = self.max_chars * 4
 
-        # Split on sentence-ending punctuation followed by space
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        for part in parts:
+            # Only the newly added text can contain a new sentence end
+            scan_from = max(len(tail) - 1, 0)
+            text = tail + part
 
-        chunks = []
-        current_chunk = ""
+            last_end = None
+            for last_end in self.SENTENCE_END.finditer(text, scan_from):
+                pass
 
-        for sentence in sentences:
-            if len(current_chunk) + len(sentence) <= self.max_chars:
-                current_chunk += sentence + " "
+            if last_end is not None:
+                cut = last_end.start() + 1
+                complete, tail = text[:cut], text[cut:]
+                carry = yield from self._pack(complete, carry)
+            elif len(text) > max_tail:
+                pieces, tail = self._split_unfinished(text)
+                if pieces and carry:
+                    # The sentence is too long to join the unfinished chunk
+                    yield carry
+                    carry = ""
+                yield from pieces
             else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence + " "
+                tail = text
+
+        carry = yield from self._pack(tail, carry)
+
+        if carry:
+            yield carry
+
+    def _measure(self, text: str) -> int:
+        return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+    def _fits(self, chars: int, size: int) -> bool:
+        return chars <= self.max_chars and (self.max_bytes is None or size <= self.max_bytes)
+
+    def _pack(self, raw: str, carry: str) -> Iterator[str]:
+        """Pack the sentences of raw onto the unfinished chunk `carry`,
+        yielding every chunk that fills up. Returns the new unfinished chunk.
+
+        Works on offsets into the normalized text, so each chunk is built
+        with a single slice (plus one join when it continues `carry`).
+        """
+        text = self.normalize_text(raw)
+        if not text:
+            return carry
+
+        # The current chunk is carry + " " + text[start:end]; start is None
+        # while nothing from this text has been added yet
+        start = end = None
+        chars = len(carry)
+        # UTF-8 size is only tracked when a byte limit is set
+        size = self._measure(carry) if self.max_bytes else 0
+
+        def current() -> str:
+            if start is None:
+                return carry
+            if carry:
+                return f"{carry} {text[start:end]}"
+            return text[start:end]
+
+        for s, e in self._sentence_spans(text):
+            sentence_size = self._measure(text[s:e]) if self.max_bytes else 0
+            if chars and self._fits(chars + 1 + e - s, size + 1 + sentence_size):
+                if start is None:
+                    start = s
+                end = e
+                chars += 1 + e - s
+                size += 1 + sentence_size
+                continue
+
+            if chars:
+                yield current()
+                carry, start, end = "", None, None
+
+            # An empty chunk takes the next sentence, splitting it if needed
+            start, end, chars, size = s, e, e - s, sentence_size
+            if not self._fits(chars, size):
+                pieces = list(self._split_long(text, s, e, sentence_size))
+                for piece_start, piece_end in pieces[:-1]:
+                    yield text[piece_start:piece_end]
+                start, end = pieces[-1]
+                chars = end - start
+                size = self._measure(text[start:end]) if self.max_bytes else 0
+
+        return current()
+
+    def _split_unfinished(self, raw: str) -> Tuple[List[str], str]:
+        """Split a sentence that later pieces may still continue.
+
+        Returns the pieces _split_long would cut the whole sentence into
+        that the text still to come cannot change, and the normalized rest.
+        """
+        text = self.normalize_text(raw)
+        size = self._measure(text) if self.max_bytes else 0
+        pieces = []
+        rest = text
+        for start, end in self._split_long(text, 0, len(text), size):
+            if start + self.max_chars >= len(text):
+                # Where this piece ends depends on the text after it
+                rest = text[start:]
+                break
+            pieces.append(text[start:end])
+        if rest and raw[-1].isspace():
+            # Still separates the rest from the next piece's text
+            rest += " "
+        return pieces, rest
+
+    def _sentence_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        pos = 0
+        for boundary in self.SENTENCE_BOUNDARY.finditer(text):
+            yield pos, boundary.start() + 1
+            pos = boundary.end()
+        yield pos, len(text)
+
+    def _split_long(self, text: str, start: int, end: int, size: int) -> Iterator[Tuple[int, int]]:
+        """Split text[start:end], which is `size` bytes, into spans that each fit the limits."""
+        pos = start
+        while not self._fits(end - pos, size):
+            limit = min(pos + self.max_chars, end)
+            if self.max_bytes:
+                # Shrink the window until its UTF-8 size fits too
+                while limit - pos > 1 and self._measure(text[pos:limit]) > self.max_bytes:
+                    limit = pos + max(1, (limit - pos) * 3 // 4)
+
+            cut = None
+            # Prefer a clause boundary in the second half of the window
+            for clause in self.CLAUSE_BOUNDARY.finditer(text, pos + (limit - pos) // 2, min(limit + 1, end)):
+                cut = clause.start() + 1
+            if cut is None:
+                space = text.rfind(" ", pos + 1, limit + 1)
+                cut = space if space > pos else limit
 
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+            yield pos, cut
+            resume = cut + 1 if cut < end and text[cut] == " " else cut
+            if self.max_bytes:
+                size -= self._measure(text[pos:resume])
+            pos = resume
 
-        return chunks
+        if pos < end:
+            yield pos, end
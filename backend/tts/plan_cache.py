@@ -0,0 +1,66 @@
+import gzip
+import hashlib
+import json
+from typing import List, Optional, Tuple
+from config import get_settings
+from storage.disk_cache import DiskLRUCache
+
+class PlanCache(DiskLRUCache):
+    """Extracted text and chunk plan per upload content hash.
+
+    Chunks are consecutive pieces of the normalized text, so the plan is
+    stored as the chunks joined by single spaces plus each chunk's length,
+    gzip-compressed. This keeps one compact copy of the book per upload that
+    any later conversion, with any voice, can reuse without parsing it.
+    """
+
+    SUFFIX = ".json.gz"
+    # Bump when extraction or chunking changes so stale plans are not reused
+    VERSION = 3
+
+    @classmethod
+    def make_key(cls, content_hash: str, max_chars: int) -> str:
+        payload = json.dumps(
+            {"version": cls.VERSION, "content": content_hash, "max_chars": max_chars},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_plan(self, key: str) -> Optional[Tuple[List[str], dict]]:
+        """Return (chunks, extraction stats) or None on a miss."""
+        data = self.get_bytes(key)
+        if data is None:
+            return None
+
+        plan = json.loads(gzip.decompress(data))
+        text = plan["text"]
+        chunks = []
+        offset = 0
+        for length in plan["chunk_lengths"]:
+            chunks.append(text[offset:offset + length])
+            # Skip the space that separated this chunk from the next
+            offset += length + 1
+        return chunks, plan["stats"]
+
+    def put_plan(self, key: str, chunks: List[str], stats: dict):
+        plan = {
+            "text": " ".join(chunks),
+            "chunk_lengths": [len(chunk) for chunk in chunks],
+            "stats": stats,
+        }
+        self.put_bytes(key, gzip.compress(json.dumps(plan, ensure_ascii=False).encode("utf-8")))
+
+
+# Singleton instance
+_plan_cache: Optional[PlanCache] = None
+
+
+def get_plan_cache() -> Optional[PlanCache]:
+    """Get the shared plan cache, or None when caching is disabled."""
+    global _plan_cache
+    settings = get_settings()
+    if settings.plan_cache_max_bytes <= 0:
+        return None
+    if _plan_cache is None:
+        _plan_cache = PlanCache(settings.plan_cache_dir, settings.plan_cache_max_bytes)
+    return _plan_cache
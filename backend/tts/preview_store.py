@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import uuid
+from typing import Dict, Iterable, Optional
+from config import get_settings
+from storage.disk_cache import DiskLRUCache
+from tts.backends.base import BaseTTSBackend
+from tts.backends.factory import TTSBackendFactory
+from tts.voice_catalogue import get_voice_catalogue
+
+logger = logging.getLogger(__name__)
+
+# Preview text for voice samples
+PREVIEW_TEXT = "Hello! This is a preview of my voice. I can read your books and documents aloud."
+
+
+class PreviewStore(DiskLRUCache):
+    """Size-bounded store of voice preview clips.
+
+    Clips are keyed by engine, voice and preview text, so the key doubles as
+    an ETag. Concurrent requests for a missing clip share one synthesis.
+    """
+
+    SUFFIX = ".mp3"
+
+    def __init__(self, cache_dir: str, max_bytes: int, backend: BaseTTSBackend, text: str = PREVIEW_TEXT):
+        super().__init__(cache_dir, max_bytes)
+        self.backend = backend
+        self.text = text
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    def make_key(self, voice_id: str) -> str:
+        payload = json.dumps(
+            {"backend": self.backend.cache_id, "voice": voice_id, "text": self.text},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def etag(self, voice_id: str) -> str:
+        return f'"{self.make_key(voice_id)}"'
+
+    async def get(self, voice_id: str) -> bytes:
+        """The voice's preview clip, synthesizing it on first use.
+
+        Clips are a few dozen KB, so they are read whole: a path could be
+        evicted by a concurrent put before the response is sent.
+        """
+        key = self.make_key(voice_id)
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            pass
+        else:
+            self._hit(key)
+            return data
+
+        task = self._pending.get(key)
+        if task is None:
+            task = self._pending[key] = asyncio.get_running_loop().create_task(self._generate(key, voice_id))
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        # One caller disconnecting must not cancel the synthesis for the others
+        return await asyncio.shield(task)
+
+    async def _generate(self, key: str, voice_id: str) -> bytes:
+        self._miss(key)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        part_path = os.path.join(self.cache_dir, f"{key}.{uuid.uuid4().hex}.part")
+        try:
+            await self.backend.synthesize(self.text, voice_id, part_path)
+            with open(part_path, "rb") as f:
+                data = f.read()
+            self._store(key, lambda tmp_path: os.replace(part_path, tmp_path))
+            return data
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+    async def prewarm(self, voice_ids: Iterable[str], concurrency: int = 2):
+        """Synthesize missing previews in the background, a few at a time."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def warm(voice_id: str):
+            async with semaphore:
+                try:
+                    await self.get(voice_id)
+                except Exception:
+                    logger.warning("Could not pre-warm preview for %s", voice_id, exc_info=True)
+
+        await asyncio.gather(*(warm(voice_id) for voice_id in voice_ids))
+
+
+async def prewarm_previews():
+    """Pre-warm previews for every voice in the catalogue."""
+    settings = get_settings()
+    try:
+        voices = await get_voice_catalogue().voices()
+    except Exception:
+        logger.warning("Voice list unavailable, previews not pre-warmed", exc_info=True)
+        return
+    await get_preview_store().prewarm([v["id"] for v in voices], settings.preview_prewarm_concurrency)
+
+
+# Singleton instance
+_preview_store: Optional[PreviewStore] = None
+
+
+def get_preview_store() -> PreviewStore:
+    global _preview_store
+    if _preview_store is None:
+        settings = get_settings()
+        _preview_store = PreviewStore(
+            settings.preview_cache_dir,
+            settings.preview_cache_max_bytes,
+            TTSBackendFactory.get_backend()
+        )
+    return _preview_store
@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import random
+import time
+from typing import List, Optional
+import redis
+from config import get_settings
+from metrics import BREAKER_OPENS
+from tts.backends.base import PermanentTTSError
+
+logger = logging.getLogger(__name__)
+
+# Errors that retrying cannot fix, e.g. edge-tts rejecting an unknown voice.
+# Anything else, such as a garbled response that fails to decode, is retried
+PERMANENT_ERRORS = (PermanentTTSError,)
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True for throttling responses (aiohttp errors carry the HTTP status)."""
+    return getattr(exc, "status", None) in (429, 503)
+
+
+class ChunkSynthesisError(Exception):
+    """Some chunks still failed after every retry.
+
+    `failures` lists {"index", "error"} per chunk. All other chunks are kept
+    in the checkpoint, so resuming only redoes these.
+    """
+
+    def __init__(self, message: str, failures: Optional[List[dict]] = None):
+        super().__init__(message)
+        self.failures = failures or []
+
+    @classmethod
+    def from_failures(cls, failures: List[dict]) -> "ChunkSynthesisError":
+        indices = ", ".join(str(failure["index"]) for failure in failures[:10])
+        if len(failures) > 10:
+            indices += ", ..."
+        return cls(
+            f"Synthesis failed for {len(failures)} chunk(s) after retries ({indices}): {failures[-1]['error']}",
+            failures
+        )
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, so workers that failed together
+    do not all retry at the same moment."""
+
+    def __init__(self, attempts: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Pauses every request when the TTS backend is rate-limiting or down.
+
+    The breaker opens on a throttling response or after `failure_threshold`
+    failures in a row. While open, callers wait in wait(). After the
+    cooldown a single probe request goes through: success closes the
+    breaker, failure reopens it with twice the cooldown (up to max_cooldown).
+
+    It only holds plain state, so one instance can serve every event loop
+    in the process. With a Redis client, every trip also stores the time
+    the breaker stays open until under `shared_key`, and breakers of other
+    processes (every prefork child and pipeline range task, on any worker)
+    pause until then as well. Probing stays with the process that tripped.
+    """
+
+    # How often callers waiting for the probe check its outcome
+    PROBE_POLL_SECONDS = 0.1
+    # How often the shared open-until time is read
+    SYNC_SECONDS = 1.0
+    # After Redis failed, stay local for this long instead of stalling on it
+    RETRY_SECONDS = 30
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        cooldown: float = 30.0,
+        max_cooldown: float = 300.0,
+        shared: Optional[redis.Redis] = None,
+        shared_key: str = "tts-breaker-open-until"
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.shared = shared
+        self.shared_key = shared_key
+        self._synced_at = 0.0
+        self._shared_failed_at: Optional[float] = None
+        self.consecutive_failures = 0
+        self.trips = 0
+        # Total times opened, for reporting
+        self.times_opened = 0
+        self.open_until = 0.0
+        self._half_open = False
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._half_open or time.monotonic() < self.open_until
+
+    async def wait(self):
+        """Return once a request may be sent."""
+        while True:
+            await self._sync()
+            remaining = self.open_until - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+                continue
+            if not self._half_open:
+                return
+            if not self._probing:
+                self._probing = True
+                return
+            await asyncio.sleep(self.PROBE_POLL_SECONDS)
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.trips = 0
+        self._half_open = False
+        self._probing = False
+
+    def record_failure(self, rate_limited: bool = False):
+        if time.monotonic() < self.open_until:
+            # Requests already in flight when the breaker opened
+            return
+        self.consecutive_failures += 1
+        if rate_limited or self._probing or self.consecutive_failures >= self.failure_threshold:
+            self._trip()
+
+    def release(self):
+        """Give up a probe slot without a verdict, e.g. on a permanent error."""
+        self._probing = False
+
+    def _trip(self):
+        cooldown = min(self.max_cooldown, self.cooldown * 2 ** self.trips)
+        self.open_until = time.monotonic() + cooldown
+        self.trips += 1
+        self.times_opened += 1
+        BREAKER_OPENS.inc()
+        self.consecutive_failures = 0
+        self._half_open = True
+        self._probing = False
+        if self.shared is not None:
+            until = time.time() + cooldown
+            try:
+                # Trips happen on the event loop; Redis is not waited for there
+                asyncio.get_running_loop().run_in_executor(None, self._share, until)
+            except RuntimeError:
+                self._share(until)
+
+    def _shared_usable(self) -> bool:
+        if self.shared is None:
+            return False
+        return self._shared_failed_at is None or time.monotonic() - self._shared_failed_at >= self.RETRY_SECONDS
+
+    def _shared_error(self):
+        logger.warning("Circuit breaker state in Redis unavailable, pausing this process only", exc_info=True)
+        self._shared_failed_at = time.monotonic()
+
+    def _share(self, until: float):
+        """Store the wall-clock open-until time, unless a later one is stored."""
+        if not self._shared_usable():
+            return
+        try:
+            with self.shared.pipeline() as pipe:
+                pipe.watch(self.shared_key)
+                current = pipe.get(self.shared_key)
+                if current is None or float(current) < until:
+                    pipe.multi()
+                    pipe.set(self.shared_key, until, px=max(1, int((until - time.time()) * 1000)))
+                    pipe.execute()
+            self._shared_failed_at = None
+        except redis.WatchError:
+            # Another process tripped it at the same moment
+            pass
+        except redis.RedisError:
+            self._shared_error()
+
+    def _read_shared(self) -> Optional[float]:
+        try:
+            value = self.shared.get(self.shared_key)
+            self._shared_failed_at = None
+            return float(value) if value is not None else None
+        except redis.RedisError:
+            self._shared_error()
+            return None
+
+    async def _sync(self):
+        """Adopt an open-until time that another process stored."""
+        now = time.monotonic()
+        if not self._shared_usable() or now - self._synced_at < self.SYNC_SECONDS:
+            return
+        self._synced_at = now
+        # In a thread, so requests in flight on this loop are not held up
+        until = await asyncio.to_thread(self._read_shared)
+        if until is not None:
+            self.open_until = max(self.open_until, time.monotonic() + until - time.time())
+
+
+def get_retry_policy() -> RetryPolicy:
+    settings = get_settings()
+    return RetryPolicy(settings.tts_retry_attempts, settings.tts_retry_base_delay, settings.tts_retry_max_delay)
+
+
+# Singleton instance, shared by every conversion in the worker process
+_circuit_breaker: Optional[CircuitBreaker] = None
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    global _circuit_breaker
+    if _circuit_breaker is None:
+        settings = get_settings()
+        _circuit_breaker = CircuitBreaker(
+            settings.tts_breaker_threshold,
+            settings.tts_breaker_cooldown,
+            settings.tts_breaker_max_cooldown,
+            # Trips pause the whole worker fleet
+            shared=redis.Redis.from_url(settings.redis_url, socket_timeout=1, socket_connect_timeout=1)
+        )
+    return _circuit_breaker
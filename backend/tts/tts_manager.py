@@ -1,13 +1,37 @@
-import edge_tts
 import asyncio
 import os
 import re
-from typing import Optional
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+from tts.backends.base import BaseTTSBackend
+from tts.backends.factory import TTSBackendFactory
+from tts.cache import ChunkCache
+from tts.chunk_sizing import ChunkSizeTuner
+from tts.voice_catalogue import get_voice_catalogue
+from tts.resilience import PERMANENT_ERRORS, CircuitBreaker, RetryPolicy, is_rate_limited
+from metrics import TTS_REQUEST_SECONDS, TTS_RETRIES
 
 class TTSManager:
-    def __init__(self, voices_dir: str):
+    def __init__(
+        self,
+        voices_dir: str,
+        backend: Optional[BaseTTSBackend] = None,
+        cache: Optional[ChunkCache] = None,
+        sizing: Optional[ChunkSizeTuner] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
         self.voices_dir = voices_dir
-        self.default_voice = "en-US-AriaNeural"
+        # The engine configured in settings unless one is passed in
+        self.backend = backend or TTSBackendFactory.get_backend()
+        self.default_voice = self.backend.default_voice
+        self.cache = cache
+        # Receives the latency of every chunk actually sent to the backend
+        self.sizing = sizing
+        # Without a retry policy the first error is final
+        self.retry = retry
+        self.breaker = breaker
 
     def _normalize_for_tts(self, text: str) -> str:
         """Normalize text to prevent unwanted pauses in TTS output."""
@@ -15,6 +39,10 @@ class TTSManager:
         text = re.sub(r'\s+', ' ', text)
         return text.strip()
 
+    def _resolve_voice(self, voice_file: Optional[str]) -> str:
+        # voice_file can be used to specify a voice name of the backend
+        return voice_file if voice_file else self.default_voice
+
     def synthesize(
         self,
         text: str,
@@ -24,26 +52,180 @@ class TTSManager:
     ) -> str:
         # Normalize text to remove line breaks
         text = self._normalize_for_tts(text)
+        voice = self._resolve_voice(voice_file)
 
-        # Use voice parameter or default
-        voice = self.default_voice
-        if voice_file:
-            # voice_file can be used to specify an edge-tts voice name
-            voice = voice_file
-
-        # Run async edge-tts in sync context
-        asyncio.run(self._synthesize_async(text, output_path, voice))
+        # Run the async backend in sync context
+        asyncio.run(self._synthesize_cached(text, output_path, voice))
         return output_path
 
+    def synthesize_many(
+        self,
+        chunks: Iterable[str],
+        output_paths: Iterable[str],
+        voice_file: Optional[str] = None,
+        concurrency: int = 4,
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+        failure_callback: Optional[Callable[[int, str, Exception], None]] = None
+    ) -> List[str]:
+        """Synthesize chunks on a single event loop with at most `concurrency`
+        requests in flight. Output paths are returned in chunk order;
+        progress_callback(index, output_path) fires as each chunk finishes.
+
+        Both arguments may be lazy iterables. They are pulled a few chunks
+        ahead of the requests in a separate thread, so synthesis can start
+        before they all exist. The callbacks run on the event loop's thread,
+        so they must not share a database session or similar with the
+        iterables.
+
+        A chunk that fails every retry aborts the whole call, unless
+        failure_callback(index, output_path, exc) is given: then it is
+        reported there and the remaining chunks carry on. The callback may
+        raise to abort after all.
+        """
+        if hasattr(chunks, "__len__") and hasattr(output_paths, "__len__") and len(chunks) != len(output_paths):
+            raise ValueError("chunks and output_paths must have the same length")
+
+        voice = self._resolve_voice(voice_file)
+        return asyncio.run(self._synthesize_many_async(
+            chunks, output_paths, voice, max(1, concurrency), progress_callback, failure_callback
+        ))
+
+    async def _synthesize_many_async(
+        self,
+        chunks: Iterable[str],
+        output_paths: Iterable[str],
+        voice: str,
+        concurrency: int,
+        progress_callback: Optional[Callable[[int, str], None]],
+        failure_callback: Optional[Callable[[int, str, Exception], None]]
+    ) -> List[str]:
+        # Pulling a lazy `chunks` runs extraction (parsing, OCR), which would
+        # stall every request in flight if it ran on the event loop. A thread
+        # pulls instead and hands chunks over through a queue that holds at
+        # most `concurrency` of them; only `concurrency` worker coroutines
+        # exist no matter how many chunks the book has.
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        space = threading.Semaphore(concurrency)
+        stopped = threading.Event()
+        results: List[str] = []
+
+        def produce():
+            try:
+                for item in enumerate(zip(chunks, output_paths)):
+                    space.acquire()
+                    if stopped.is_set():
+                        return
+                    loop.call_soon_threadsafe(queue.put_nowait, item)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    # Leave the end marker for the other workers
+                    queue.put_nowait(None)
+                    return
+                space.release()
+                idx, (text, output_path) = item
+                results.append(output_path)
+                try:
+                    await self._synthesize_cached(self._normalize_for_tts(text), output_path, voice)
+                except Exception as exc:
+                    if not failure_callback:
+                        raise
+                    failure_callback(idx, output_path, exc)
+                    continue
+                if progress_callback:
+                    progress_callback(idx, output_path)
+
+        producer = loop.run_in_executor(None, produce)
+        workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+        try:
+            # Extraction errors surface through the producer
+            await asyncio.gather(producer, *workers)
+        except BaseException:
+            stopped.set()
+            space.release()
+            for task in workers:
+                task.cancel()
+            # The producer finishes the chunk it is pulling, then stops
+            await asyncio.gather(producer, *workers, return_exceptions=True)
+            raise
+        return results
+
+    def _cache_key(self, text: str, voice: str) -> str:
+        # Audio from different backends (e.g. a fake one) must never mix
+        return ChunkCache.make_key(text, voice, backend=self.backend.cache_id)
+
+    async def _synthesize_cached(self, text: str, output_path: str, voice: str):
+        if not self.cache:
+            await self._synthesize_resilient(text, output_path, voice)
+            return
+
+        key = self._cache_key(text, voice)
+        if self.cache.get(key, output_path):
+            return
+
+        await self._synthesize_resilient(text, output_path, voice)
+        self.cache.put(key, output_path)
+
+    async def _synthesize_resilient(self, text: str, output_path: str, voice: str):
+        """Retry transient errors with backoff, honouring the circuit breaker."""
+        attempts = self.retry.attempts if self.retry else 1
+        for attempt in range(1, attempts + 1):
+            if self.breaker:
+                await self.breaker.wait()
+
+            try:
+                await self._synthesize_timed(text, output_path, voice)
+            except PERMANENT_ERRORS:
+                if self.breaker:
+                    self.breaker.release()
+                raise
+            except Exception as exc:
+                if self.breaker:
+                    self.breaker.record_failure(is_rate_limited(exc))
+                if attempt == attempts:
+                    raise
+                TTS_RETRIES.labels(self.backend.name).inc()
+                await asyncio.sleep(self.retry.delay(attempt))
+                continue
+            except BaseException:
+                # Cancelled: the breaker outlives this event loop
+                if self.breaker:
+                    self.breaker.release()
+                raise
+
+            if self.breaker:
+                self.breaker.record_success()
+            return
+
+    async def _synthesize_timed(self, text: str, output_path: str, voice: str):
+        started = time.monotonic()
+        try:
+            await self._synthesize_async(text, output_path, voice)
+        except Exception:
+            elapsed = time.monotonic() - started
+            TTS_REQUEST_SECONDS.labels(self.backend.name, voice, "error").observe(elapsed)
+            if self.sizing:
+                self.sizing.record_failure(voice, len(text), elapsed)
+            raise
+
+        elapsed = time.monotonic() - started
+        TTS_REQUEST_SECONDS.labels(self.backend.name, voice, "ok").observe(elapsed)
+        if self.sizing:
+            self.sizing.record(voice, len(text), elapsed)
+
     async def _synthesize_async(self, text: str, output_path: str, voice: str):
-        communicate = edge_tts.Communicate(text, voice)
-        await communicate.save(output_path)
+        await self.backend.synthesize(text, voice, output_path)
 
     def get_available_voices(self):
-        """Return list of available edge-tts voices"""
-        voices = asyncio.run(self._get_voices_async())
-        return voices
-
-    async def _get_voices_async(self):
-        voices = await edge_tts.list_voices()
-        return [v["ShortName"] for v in voices]
+        """Return list of available voice ids of the backend"""
+        catalogue = get_voice_catalogue()
+        if catalogue.backend is self.backend:
+            voices = catalogue.voices_sync()
+        else:
+            voices = asyncio.run(self.backend.list_voices())
+        return [v["id"] for v in voices]
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from config import get_settings
+from tts.backends.base import BaseTTSBackend
+from tts.backends.factory import TTSBackendFactory
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceCatalogue:
+    """The backend's voice list, fetched once and kept fresh in the background.
+
+    Voices are indexed by every prefix of their locale ("", "e", "en",
+    "en-", "en-US") with and without a gender, so a filtered lookup is one
+    dict access. Lists are pre-sorted by locale and name.
+
+    Each refresh is saved as a JSON snapshot, which is served at startup
+    until the backend answers; when the backend is unreachable the last
+    snapshot keeps being served.
+    """
+
+    def __init__(self, backend: BaseTTSBackend, snapshot_path: str, ttl: float = 3600):
+        self.backend = backend
+        self.snapshot_path = snapshot_path
+        self.ttl = ttl
+        # Wall-clock time of the fetch the current voices came from
+        self.fetched_at: Optional[float] = None
+        self._by_id: Dict[str, dict] = {}
+        self._by_prefix: Dict[Tuple[str, Optional[str]], List[dict]] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._runner: Optional[asyncio.Task] = None
+
+    @property
+    def is_stale(self) -> bool:
+        return self.fetched_at is None or time.time() - self.fetched_at >= self.ttl
+
+    def _index(self, voices: List[dict], fetched_at: float):
+        voices = sorted(voices, key=lambda v: (v["locale"], v["name"]))
+        by_prefix: Dict[Tuple[str, Optional[str]], List[dict]] = {}
+        for voice in voices:
+            gender = voice["gender"].lower()
+            for end in range(len(voice["locale"]) + 1):
+                prefix = voice["locale"][:end]
+                by_prefix.setdefault((prefix, None), []).append(voice)
+                by_prefix.setdefault((prefix, gender), []).append(voice)
+
+        # Swap everything at once so readers never see a half-built index
+        self._by_id = {voice["id"]: voice for voice in voices}
+        self._by_prefix = by_prefix
+        self.fetched_at = fetched_at
+
+    def _load_snapshot(self) -> bool:
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+
+        # A snapshot of another engine's voices is of no use
+        if snapshot.get("backend") != self.backend.cache_id:
+            return False
+        self._index(snapshot["voices"], snapshot["fetched_at"])
+        return True
+
+    def _save_snapshot(self, voices: List[dict]):
+        os.makedirs(os.path.dirname(os.path.abspath(self.snapshot_path)), exist_ok=True)
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"backend": self.backend.cache_id, "fetched_at": self.fetched_at, "voices": voices}, f)
+        os.replace(tmp_path, self.snapshot_path)
+
+    async def refresh(self):
+        """Fetch the voice list from the backend now."""
+        voices = await self.backend.list_voices()
+        self._index(voices, time.time())
+        self._save_snapshot(voices)
+
+    async def _refresh_quietly(self):
+        try:
+            await self.refresh()
+        except Exception:
+            logger.warning("Voice list refresh failed, serving the previous list", exc_info=True)
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            logger.warning("Voice list refresh failed", exc_info=task.exception())
+
+    def _start_refresh(self) -> asyncio.Task:
+        """Start a refresh unless one is already running on this loop."""
+        loop = asyncio.get_running_loop()
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = self._refresh_task = loop.create_task(self.refresh())
+            task.add_done_callback(self._log_failure)
+        return task
+
+    async def _ensure_loaded(self):
+        if self.fetched_at is None and not self._load_snapshot():
+            # Nothing to serve yet: concurrent callers share one fetch
+            await asyncio.shield(self._start_refresh())
+        elif self.is_stale:
+            self._start_refresh()
+
+    async def voices(self, locale_prefix: str = "", gender: Optional[str] = None) -> List[dict]:
+        """Voices whose locale starts with locale_prefix, optionally of one gender."""
+        await self._ensure_loaded()
+        return self._by_prefix.get((locale_prefix, gender.lower() if gender else None), [])
+
+    async def get(self, voice_id: str) -> Optional[dict]:
+        await self._ensure_loaded()
+        return self._by_id.get(voice_id)
+
+    def voices_sync(self, locale_prefix: str = "", gender: Optional[str] = None) -> List[dict]:
+        """voices() for callers without an event loop; refreshes inline when stale."""
+        if self.fetched_at is None:
+            self._load_snapshot()
+        if self.is_stale:
+            try:
+                asyncio.run(self.refresh())
+            except Exception:
+                if self.fetched_at is None:
+                    raise
+                logger.warning("Voice list refresh failed, serving the previous list", exc_info=True)
+        return self._by_prefix.get((locale_prefix, gender.lower() if gender else None), [])
+
+    def start(self):
+        """Keep the catalogue fresh from a task on the running event loop."""
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        self._load_snapshot()
+        while True:
+            if self.is_stale:
+                await self._refresh_quietly()
+            # Wake up when the current list expires, but retry failures sooner
+            wait = self.ttl - (time.time() - self.fetched_at) if self.fetched_at else 0
+            await asyncio.sleep(max(wait, min(self.ttl, 60)))
+
+
+# Singleton instance
+_voice_catalogue: Optional[VoiceCatalogue] = None
+
+
+def get_voice_catalogue() -> VoiceCatalogue:
+    global _voice_catalogue
+    if _voice_catalogue is None:
+        settings = get_settings()
+        _voice_catalogue = VoiceCatalogue(
+            TTSBackendFactory.get_backend(),
+            settings.voice_catalogue_path,
+            settings.voice_catalogue_ttl
+        )
+    return _voice_catalogue
@@ -40,7 +40,7 @@ echo "Press Ctrl+C to stop"
 echo ""
 echo -e "${YELLOW}Note: Open a second terminal and run:${NC}"
 echo "  cd $BACKEND_DIR && source venv/bin/activate"
-echo "  celery -A celery_app worker --loglevel=info --queues=conversions"
+echo "  celery -A celery_app worker --loglevel=info --queues=conversions.short,conversions,conversions.long"
 echo ""
 
 # Start FastAPI with reload
@@ -15,12 +15,18 @@ const state = {
     playingVoiceId: null,
     theme: 'light',
     tasks: [],
-    taskPollingInterval: null
+    // X-Next-Cursor of the last page loaded; null once every task is shown
+    tasksCursor: null,
+    taskPollingInterval: null,
+    eventSource: null,
+    eventsConnected: false,
+    renderScheduled: false
 };
 
 // API Configuration
 const API_BASE = '/api';
 const POLLING_INTERVAL = 2000;
+const TASK_PAGE_SIZE = 50;
 
 // DOM Elements
 const elements = {
@@ -72,7 +78,8 @@ const elements = {
     taskEmpty: null,
     taskTableHeader: null,
     cancelAllBtn: null,
-    clearCompletedBtn: null
+    clearCompletedBtn: null,
+    loadMoreTasksBtn: null
 };
 
 // Initialize application
@@ -82,6 +89,7 @@ document.addEventListener('DOMContentLoaded', () => {
     initializeTheme();
     loadVoices();
     loadTasks();
+    connectConversionEvents();
 });
 
 function initializeElements() {
@@ -126,6 +134,7 @@ function initializeElements() {
     elements.taskTableHeader = document.getElementById('taskTableHeader');
     elements.cancelAllBtn = document.getElementById('cancelAllBtn');
     elements.clearCompletedBtn = document.getElementById('clearCompletedBtn');
+    elements.loadMoreTasksBtn = document.getElementById('loadMoreTasksBtn');
 }
 
 function initializeEventListeners() {
@@ -159,6 +168,7 @@ function initializeEventListeners() {
     // Task Manager events
     elements.cancelAllBtn.addEventListener('click', cancelAllTasks);
     elements.clearCompletedBtn.addEventListener('click', clearCompletedTasks);
+    elements.loadMoreTasksBtn.addEventListener('click', loadMoreTasks);
 }
 
 // File Upload Handling
@@ -589,17 +599,38 @@ function applyTheme(theme) {
 }
 
 // Task Manager
+async function fetchTaskPage(cursor) {
+    const params = new URLSearchParams({ active_only: 'false', limit: TASK_PAGE_SIZE });
+    if (cursor) params.set('cursor', cursor);
+
+    const response = await fetch(`${API_BASE}/conversion/list?${params}`);
+    if (!response.ok) throw new Error('Failed to load tasks');
+
+    return {
+        tasks: await response.json(),
+        cursor: response.headers.get('X-Next-Cursor')
+    };
+}
+
 async function loadTasks() {
     try {
-        const response = await fetch(`${API_BASE}/conversion/list?active_only=false`);
-        if (!response.ok) throw new Error('Failed to load tasks');
-
-        state.tasks = await response.json();
+        // Reload as many pages as are shown, so a refresh keeps what
+        // "Load More" added
+        let tasks = [];
+        let cursor = null;
+        do {
+            const page = await fetchTaskPage(cursor);
+            tasks = tasks.concat(page.tasks);
+            cursor = page.cursor;
+        } while (cursor && tasks.length < state.tasks.length);
+
+        state.tasks = tasks;
+        state.tasksCursor = cursor;
         renderTaskList();
 
-        // Only poll if there are active tasks
+        // Only poll if there are active tasks and no live updates
         const hasActiveTasks = state.tasks.some(t => ['pending', 'processing'].includes(t.status));
-        if (hasActiveTasks) {
+        if (hasActiveTasks && !state.eventsConnected) {
             startTaskPolling();
         } else {
             stopTaskPolling();
@@ -609,6 +640,80 @@ async function loadTasks() {
     }
 }
 
+async function loadMoreTasks() {
+    if (!state.tasksCursor) return;
+
+    try {
+        const page = await fetchTaskPage(state.tasksCursor);
+        // Rows shift between pages while tasks are added
+        const shown = new Set(state.tasks.map(t => t.id));
+        state.tasks = state.tasks.concat(page.tasks.filter(t => !shown.has(t.id)));
+        state.tasksCursor = page.cursor;
+        renderTaskList();
+    } catch (error) {
+        console.error('Error loading tasks:', error);
+    }
+}
+
+// Live progress pushed by the server; polling is only the fallback
+function connectConversionEvents() {
+    if (!window.EventSource) return;
+
+    state.eventSource = new EventSource(`${API_BASE}/conversion/events`);
+
+    state.eventSource.onopen = () => {
+        state.eventsConnected = true;
+        stopTaskPolling();
+        // Catch up on anything missed while disconnected
+        loadTasks();
+    };
+
+    state.eventSource.onerror = () => {
+        // EventSource reconnects by itself; poll in the meantime
+        state.eventsConnected = false;
+        loadTasks();
+    };
+
+    state.eventSource.onmessage = (event) => {
+        handleConversionEvent(JSON.parse(event.data));
+    };
+}
+
+// Newest first, like /conversion/list
+function compareTasks(a, b) {
+    return (new Date(b.created_at) - new Date(a.created_at)) || (b.id - a.id);
+}
+
+function handleConversionEvent(conversion) {
+    const index = state.tasks.findIndex(t => t.id === conversion.id);
+    const oldest = state.tasks[state.tasks.length - 1];
+    if (index !== -1) {
+        state.tasks[index] = conversion;
+        scheduleRenderTaskList();
+    } else if (!state.tasksCursor || !oldest || compareTasks(conversion, oldest) < 0) {
+        // Started elsewhere, e.g. in another tab. The event carries the whole
+        // conversion, so it needs no fetch; one older than the pages loaded
+        // is left for "Load More" to bring in its place.
+        state.tasks.push(conversion);
+        state.tasks.sort(compareTasks);
+        scheduleRenderTaskList();
+    }
+
+    if (conversion.id === state.conversionId) {
+        handleStatusUpdate(conversion);
+    }
+}
+
+function scheduleRenderTaskList() {
+    // Coalesce bursts of events into one render per frame
+    if (state.renderScheduled) return;
+    state.renderScheduled = true;
+    requestAnimationFrame(() => {
+        state.renderScheduled = false;
+        renderTaskList();
+    });
+}
+
 function startTaskPolling() {
     if (state.taskPollingInterval) {
         clearInterval(state.taskPollingInterval);
@@ -631,6 +736,7 @@ function renderTaskList() {
     elements.taskTableHeader.hidden = !hasTasks;
     elements.taskEmpty.hidden = hasTasks;
     elements.cancelAllBtn.hidden = !hasTasks;
+    elements.loadMoreTasksBtn.hidden = !state.tasksCursor;
 
     if (!hasTasks) {
         elements.taskList.innerHTML = '';
@@ -32,7 +32,7 @@ timeout /t 3 /nobreak >nul
 
 :: Start Celery in new window
 echo Starting Celery worker...
-start "Voynich-Celery" cmd /k "cd /d %~dp0backend && ..\venv\Scripts\activate && celery -A celery_app worker --loglevel=info --pool=solo -Q conversions"
+start "Voynich-Celery" cmd /k "cd /d %~dp0backend && ..\venv\Scripts\activate && celery -A celery_app worker --loglevel=info --pool=solo -Q conversions.short,conversions,conversions.long"
 
 echo.
 echo === All services started! ===
@@ -90,7 +90,7 @@ fi
 # Start Celery worker
 if ! check_running "celery"; then
     echo "Starting Celery worker..."
-    nohup celery -A celery_app worker --loglevel=info --queues=conversions > "$LOG_DIR/celery.log" 2>&1 &
+    nohup celery -A celery_app worker --loglevel=info --queues=conversions.short,conversions,conversions.long > "$LOG_DIR/celery.log" 2>&1 &
     echo $! > "$PID_DIR/celery.pid"
     sleep 2
     echo -e "${GREEN}[OK] Celery worker started${NC}"